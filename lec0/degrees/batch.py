@@ -0,0 +1,127 @@
+import csv
+import multiprocessing
+import sys
+import time
+
+import degrees
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python batch.py directory pairs.csv [processes]")
+    directory = sys.argv[1]
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    # Load the data and start the workers before the clock starts, so the
+    # rate only counts the queries
+    with start_pool(directory, processes) as pool, open(sys.argv[2], encoding="utf-8") as f:
+        pairs = read_pairs(f)
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["source", "target", "degrees", "status"])
+        start = time.perf_counter()
+        count = 0
+        for source, target, path, status in pool_paths(pool, pairs):
+            writer.writerow([source, target, "" if path is None else len(path), status])
+            count += 1
+        elapsed = time.perf_counter() - start
+
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"{count} pairs in {elapsed:.2f}s ({rate:.1f} pairs/s)", file=sys.stderr)
+
+
+def read_pairs(lines):
+    """
+    Yields (source, target) pairs from CSV lines of person ids or names,
+    skipping blank rows and a "source,target" header.
+    """
+    for row in csv.reader(lines):
+        if len(row) < 2 or [value.strip().lower() for value in row[:2]] == ["source", "target"]:
+            continue
+        yield row[0].strip(), row[1].strip()
+
+
+def batch_paths(pairs, directory, processes=None, chunksize=16):
+    """
+    Yields (source, target, path, status) for each (source, target) pair
+    as soon as a worker finishes it, so results arrive out of order. See
+    solve for what path and status hold.
+
+    The data is loaded and the pool started on the first step; use
+    start_pool and pool_paths to keep those out of a timing.
+    """
+    with start_pool(directory, processes) as pool:
+        yield from pool_paths(pool, pairs, chunksize)
+
+
+def start_pool(directory, processes=None):
+    """
+    Loads directory and returns a multiprocessing Pool of that many
+    workers (default: one per CPU) that share the data read-only: forked
+    workers inherit the parent's graph, and where fork is unavailable
+    each worker maps the same snapshot file.
+    """
+    degrees.load_data(directory)
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        context = multiprocessing.get_context("spawn")
+        initializer, initargs = degrees.load_data, (directory,)
+    return context.Pool(processes, initializer, initargs)
+
+
+def pool_paths(pool, pairs, chunksize=16):
+    """
+    Returns an iterator of (source, target, path, status) for each pair, answered
+    by the workers of a pool from start_pool in the order they finish.
+    """
+    return pool.imap_unordered(solve, pairs, chunksize)
+
+
+def solve(pair):
+    """
+    Returns (source, target, path, status) for one pair, run inside a
+    worker. status is "ok" if path is the shortest path between them,
+    and otherwise path is None and status says why: "not_found" or
+    "ambiguous" if either one cannot be resolved to a single person,
+    or "not_connected".
+    """
+    source, target = pair
+    source_id, source_status = lookup(source)
+    target_id, target_status = lookup(target)
+    for status in (source_status, target_status):
+        if status != "ok":
+            return source, target, None, status
+    path = degrees.shortest_path(source_id, target_id)
+    return source, target, path, "not_connected" if path is None else "ok"
+
+
+def resolve(value):
+    """
+    Returns the person_id for value, which may be an id or a name that
+    matches exactly one person, ignoring accents and punctuation if no
+    name matches as given. Returns None otherwise.
+    """
+    person_id, _ = lookup(value)
+    return person_id
+
+
+def lookup(value):
+    """
+    Returns (person_id, status) for value as resolve finds it, with
+    status "ok", or None and "not_found" or "ambiguous".
+    """
+    if value in degrees.people:
+        return value, "ok"
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 0:
+        person_ids = {candidate.person_id for candidate in degrees.name_index.lookup(value)}
+    if len(person_ids) == 0:
+        return None, "not_found"
+    if len(person_ids) > 1:
+        return None, "ambiguous"
+    return next(iter(person_ids)), "ok"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import batch
+import degrees
+import snapshot
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Queries timed one at a time, and in one batch across processes
+QUERIES = 200
+BATCH_QUERIES = 1000
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "compare":
+        compare(sys.argv[2], sys.argv[3])
+        return
+    if len(sys.argv) not in (3, 4) or sys.argv[1] != "run":
+        sys.exit(
+            "Usage: python benchmark.py run directory [report.json]\n"
+            "       python benchmark.py compare old.json new.json"
+        )
+
+    report = run(sys.argv[2])
+    text = json.dumps(report, indent=2)
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def run(directory, queries=QUERIES, batch_queries=BATCH_QUERIES, seed=0):
+    """
+    Times loading directory, answering shortest_path queries one at a
+    time, and answering a batch of queries in worker processes. Returns
+    a report of times in seconds and rates per second, ready to be saved
+    as JSON.
+
+    Each section also records peak_rss_kb_so_far, the peak resident
+    memory of this process from its start to the end of that section.
+    It only grows, so a section's own use shows as the increase over the
+    section before; the batch workers' memory is not counted.
+    """
+    report = {
+        "directory": os.path.abspath(directory),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
+
+    # Load from the CSV files, then from the snapshot that load wrote
+    try:
+        os.remove(snapshot.snapshot_path(directory))
+    except FileNotFoundError:
+        pass
+    report["load_csv"] = timed(degrees.load_data, directory)
+    report["load_snapshot"] = timed(degrees.load_data, directory)
+
+    graph = degrees.graph
+    report["graph"] = {
+        "people": graph.person_count(),
+        "movies": graph.movie_count(),
+        "edges": graph.edge_count(),
+        "largest_component": max(degrees.components.component_sizes())
+    }
+
+    rng = random.Random(seed)
+    pairs = random_pairs(rng, queries)
+    latencies = []
+    lengths = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target)
+        latencies.append(time.perf_counter() - start)
+        if path is not None:
+            lengths.append(len(path))
+    report["shortest_path"] = {
+        "queries": len(pairs),
+        "connected": len(lengths),
+        "mean_degrees": statistics.fmean(lengths) if lengths else None,
+        "seconds": sum(latencies),
+        "per_second": len(pairs) / sum(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "max": max(latencies),
+        "peak_rss_kb_so_far": max_rss()
+    }
+
+    # Load the data and start every worker before the clock starts, so
+    # the batch rate compares with the single-query rate
+    pairs = random_pairs(rng, batch_queries)
+    processes = os.cpu_count() or 1
+    with batch.start_pool(directory, processes) as pool:
+        pool.map(abs, range(processes), 1)
+        start = time.perf_counter()
+        answered = sum(1 for _ in batch.pool_paths(pool, pairs))
+        elapsed = time.perf_counter() - start
+    report["batch"] = {
+        "queries": answered,
+        "processes": processes,
+        "seconds": elapsed,
+        "per_second": answered / elapsed,
+        "peak_rss_kb_so_far": max_rss()
+    }
+    return report
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return {"seconds": time.perf_counter() - start, "peak_rss_kb_so_far": max_rss()}
+
+
+def random_pairs(rng, count):
+    """
+    Returns count pairs of person_ids, half of them drawn from the largest
+    component so that the searches are not all trivially disconnected.
+    """
+    graph = degrees.graph
+    components = degrees.components
+    people = [person for person in range(graph.person_count()) if person not in graph.removed_people]
+    root = max(people, key=components.size)
+    largest = [person for person in people if components.connected(person, root)]
+
+    pairs = []
+    for i in range(count):
+        pool = largest if i % 2 == 0 else people
+        pairs.append((graph.person_ids[rng.choice(pool)], graph.person_ids[rng.choice(pool)]))
+    return pairs
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+
+def max_rss():
+    """
+    Returns the peak resident memory of this process so far in kilobytes,
+    or None where the platform cannot tell.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+def compare(old_path, new_path):
+    """
+    Prints every number two reports share, with the new one as a
+    ratio of the old one.
+    """
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    for section, values in new.items():
+        if not isinstance(values, dict) or not isinstance(old.get(section), dict):
+            continue
+        for name, value in values.items():
+            before = old[section].get(name)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)):
+                continue
+            ratio = f"{value / before:.2f}x" if before else "-"
+            print(f"{section}.{name}: {before:.6g} -> {value:.6g} ({ratio})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from array import array
+
+
+class Components():
+    """
+    Union-find over the people of a graph: two people are connected
+    exactly when their roots are the same. The parent array starts as the
+    flattened graph.person_component labels, so find is a single lookup
+    until unions are made.
+
+    Unions keep the index current as people and stars are added; removals
+    can split a component, so they mark the index stale and it is rebuilt
+    from the graph the next time it is used.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.parent = graph.person_component
+        self.sizes = None
+
+    def labels(self):
+        if self.parent is None:
+            self.parent = component_labels(self.graph)
+        return self.parent
+
+    def find(self, person):
+        parent = self.labels()
+        while parent[person] != person:
+            person = parent[person]
+        return person
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def size(self, person):
+        """
+        Returns the number of people in the component of person.
+        """
+        return self.component_sizes()[self.find(person)]
+
+    def component_sizes(self):
+        if self.sizes is None:
+            parent = self.labels()
+            self.sizes = array("i", [0]) * len(parent)
+            for person in range(len(parent)):
+                self.sizes[self.find(person)] += 1
+        return self.sizes
+
+    def add_person(self):
+        """
+        Adds the graph's newest person as a component of their own.
+        """
+        if self.parent is None:
+            return
+        self.writable()
+        person = len(self.parent)
+        self.parent.append(person)
+        if self.sizes is not None:
+            self.sizes.append(1)
+
+    def union(self, a, b):
+        """
+        Merges the components of a and b, attaching the smaller one.
+        """
+        if self.parent is None:
+            return
+        sizes = self.component_sizes()
+        self.writable()
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return
+        if sizes[a] < sizes[b]:
+            a, b = b, a
+        self.parent[b] = a
+        sizes[a] += sizes[b]
+
+    def invalidate(self):
+        self.parent = None
+        self.sizes = None
+
+    def writable(self):
+        if not isinstance(self.parent, array):
+            copy = array("i")
+            copy.frombytes(self.parent.cast("B"))
+            self.parent = copy
+
+
+def component_labels(graph):
+    """
+    Returns an array mapping each person to a representative person of
+    their connected component, found by union-find over movie casts.
+    """
+    parent = array("i", range(graph.person_count()))
+
+    def find(person):
+        while parent[person] != person:
+            parent[person] = parent[parent[person]]
+            person = parent[person]
+        return person
+
+    for movie in range(graph.movie_count()):
+        stars = graph.stars_of(movie)
+        if len(stars) < 2:
+            continue
+        root = find(stars[0])
+        for star in stars[1:]:
+            other = find(star)
+            if other != root:
+                parent[other] = root
+
+    for person in range(len(parent)):
+        parent[person] = find(person)
+    return parent
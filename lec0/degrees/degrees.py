@@ -1,7 +1,16 @@
-import csv
+import itertools
 import sys
+import time
 
-from util import Node, StackFrontier, QueueFrontier
+import landmarks
+import loader
+import paths
+import snapshot
+from components import Components
+from graph import NamesView, PeopleView, MoviesView
+from nameindex import NameIndex
+from trees import TreeCache
+from util import Node, StackFrontier, QueueFrontier, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,56 +21,74 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# NameIndex for prompt-free exact, normalized and prefix name lookups
+name_index = None
 
-def load_data(directory):
-    """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+# Compact integer-indexed graph that names, people and movies are views over
+graph = None
+
+# Connected components of graph, so disconnected pairs need no search
+components = None
+
+# Optional LandmarkIndex that shortest_path uses for A* search when it is
+# set; slower than the default search on co-star graphs
+landmark_index = None
+
+# Optional TreeCache that shortest_path answers from when it is set
+tree_cache = None
+
+# Optional callback that shortest_path passes a SearchStats after each search
+search_callback = None
+
+# Seconds the last load_data call took
+load_time = None
+
+# Seconds person_id_for_name has spent looking names up since main last
+# reset it, reported to search_callback with the next search
+resolve_time = 0.0
+
+
+def load_data(directory, progress=None):
+    """
+    Load data into memory, from the binary snapshot in directory if it
+    is still up to date, otherwise from the CSV files. progress is passed
+    on to loader.load_csv.
+    """
+    global names, people, movies, name_index, graph, components, landmark_index, tree_cache, load_time
+    start = time.perf_counter()
+    graph = snapshot.load(directory)
+    if graph is None:
+        graph = loader.load_csv(directory, progress)
+        try:
+            snapshot.save(directory, graph)
+        except OSError:
+            pass
+    names = NamesView(graph)
+    people = PeopleView(graph)
+    movies = MoviesView(graph)
+    name_index = NameIndex(graph)
+    components = Components(graph)
+    landmark_index = None
+    if tree_cache is not None:
+        tree_cache = TreeCache(graph, tree_cache.max_bytes)
+    load_time = time.perf_counter() - start
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    global search_callback, resolve_time
+    arguments = [argument for argument in sys.argv[1:] if argument != "--stats"]
+    if len(arguments) > 1:
+        sys.exit("Usage: python degrees.py [directory] [--stats]")
+    directory = arguments[0] if len(arguments) == 1 else "large"
+    if "--stats" in sys.argv:
+        search_callback = print_stats
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, loader.print_progress)
     print("Data loaded.")
 
+    resolve_time = 0.0
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
@@ -84,45 +111,375 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=True):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    By default the search grows a frontier from both ends; pass
+    bidirectional=False for a plain breadth-first search from the source.
+    If tree_cache is set, the path is read from a cached search tree;
+    otherwise if landmark_index is set, A* search is used. A* is not the
+    faster path: on co-star graphs it expands far more people than the
+    default search and runs much slower, so it is only an option for
+    experimenting with landmark heuristics.
+
+    If search_callback is set, it is called with a SearchStats
+    describing the search once the path is found.
+    """
+    if search_callback is None:
+        return search(source, target, bidirectional)
+    stats = SearchStats(load_time, resolve_time)
+    path = search(source, target, bidirectional, stats)
+    search_callback(stats)
+    return path
+
+
+def search(source, target, bidirectional=True, stats=None):
+    """
+    Answers shortest_path, recording into stats if it is given.
+    """
+    if stats is not None:
+        start = time.perf_counter()
+    source_index = graph.find_person(source)
+    target_index = graph.find_person(target)
+    found = source_index is not None and target_index is not None
+    connected = found and components.connected(source_index, target_index)
+    if stats is not None:
+        # Rejected pairs are answered here, without a search
+        stats.lookup_time = time.perf_counter() - start
+        stats.method = "components" if found else "not_found"
+        start = time.perf_counter()
+    if not connected:
+        return None
+
+    if tree_cache is not None:
+        method = "tree_cache"
+        path = tree_cache.path(source_index, target_index)
+    elif landmark_index is not None:
+        method = "astar"
+        path = landmarks.astar_search(graph, landmark_index, source_index, target_index)
+    elif bidirectional:
+        method = "bidirectional"
+        path = bidirectional_search(source_index, target_index, stats)
+    else:
+        method = "breadth_first"
+        path = breadth_first_search(source_index, target_index, stats)
+    if stats is not None:
+        stats.method = method
+        stats.search_time = time.perf_counter() - start
+    if path is None:
+        return None
+    return path_ids(path)
+
+
+def shortest_paths(source, targets, max_depth=None):
+    """
+    Returns a dict mapping each of targets to the shortest list of
+    (movie_id, person_id) pairs that connect the source to it, found with
+    a single breadth-first search from the source.
+
+    A target maps to None if it is not connected to the source or is more
+    than max_depth degrees away.
+    """
+    nearest = nearest_sources([source], targets, max_depth)
+    return {
+        target: None if found is None else found[1]
+        for target, found in nearest.items()
+    }
+
+
+def nearest_sources(sources, targets, max_depth=None):
+    """
+    Returns a dict mapping each of targets to (source, path) for whichever
+    of sources is the fewest degrees away from it, path being the shortest
+    list of (movie_id, person_id) pairs from that source to the target.
+
+    All sources are searched from at once, and the search stops as soon as
+    every target has been reached or after max_depth levels. A target maps
+    to None if no source is within reach.
+    """
+    source_indices = {graph.find_person(source) for source in sources} - {None}
+    source_components = {components.find(source) for source in source_indices}
+    target_indices = {}
+    for target in targets:
+        target_index = graph.find_person(target)
+        if target_index is not None and components.find(target_index) in source_components:
+            target_indices[target] = target_index
+
+    parents = multi_source_search(source_indices, set(target_indices.values()), max_depth)
+    nearest = {}
+    for target in targets:
+        person = target_indices.get(target)
+        if person not in parents:
+            nearest[target] = None
+            continue
+        path = []
+        while parents[person] is not None:
+            movie, parent = parents[person]
+            path.append((graph.movie_ids[movie], graph.person_ids[person]))
+            person = parent
+        path.reverse()
+        nearest[target] = (graph.person_ids[person], path)
+    return nearest
+
+
+def multi_source_search(sources, targets, max_depth=None):
+    """
+    Returns a dict mapping each person reached by a breadth-first search
+    from all of sources at once to the (movie, person) it was reached
+    from, or to None for the sources themselves.
+
+    The search stops once every one of targets has been reached, or after
+    max_depth levels if that comes first.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    parents = {source: None for source in sources}
+    remaining = set(targets) - parents.keys()
+    seen_movies = set()
+    frontier = list(parents)
+    depth = 0
+    while frontier and remaining and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+                if movie in seen_movies:
+                    continue
+                seen_movies.add(movie)
+                for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                    if star in parents:
+                        continue
+                    parents[star] = (movie, person)
+                    remaining.discard(star)
+                    if not remaining:
+                        return parents
+                    next_frontier.append(star)
+        frontier = next_frontier
+    return parents
+
+
+def all_shortest_paths(source, target):
     """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, one at a time.
+    """
+    dag = layered_dag(source, target)
+    if dag is not None:
+        for path in dag.paths():
+            yield path_ids(path)
+
+
+def count_shortest_paths(source, target):
+    """
+    Returns how many shortest paths connect the source to the target,
+    without listing them.
+    """
+    dag = layered_dag(source, target)
+    if dag is None:
+        return 0
+    return dag.count()
+
+
+def k_shortest_paths(source, target, k):
+    """
+    Yields up to k lists of (movie_id, person_id) pairs that connect the
+    source to the target without repeating a person, shortest first.
+    """
+    source_index = graph.find_person(source)
+    target_index = graph.find_person(target)
+    if source_index is None or target_index is None:
+        return
+    if not components.connected(source_index, target_index):
+        return
+    for path in itertools.islice(paths.simple_paths(graph, source_index, target_index), k):
+        yield path_ids(path)
+
+
+def layered_dag(source, target):
+    """
+    Returns the paths.LayeredDag of shortest paths from source to target,
+    or None if they are not connected.
+    """
+    source_index = graph.find_person(source)
+    target_index = graph.find_person(target)
+    if source_index is None or target_index is None:
+        return None
+    if not components.connected(source_index, target_index):
+        return None
+    return paths.LayeredDag(graph, source_index, target_index)
+
+
+def path_ids(path):
+    return [(graph.movie_ids[movie], graph.person_ids[person]) for movie, person in path]
 
-    # TODO
+
+def breadth_first_search(source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs from source
+    to target using a single breadth-first search, or None.
+    """
     start = Node(state = source, parent = None, action = None)
     frontier = QueueFrontier()
     explored = set()
     frontier.add(start)
-    explored.add(start)
+    explored.add(source)
 
     while True:
         if frontier.empty():
             return None
+        if stats is not None:
+            stats.frontier_size(len(frontier.frontier))
         node = frontier.remove()
         if node.state == target:
             path = []
             while node.parent != None:
-                path.append((node.action, node.parent.state))
+                path.append((node.action, node.state))
                 node = node.parent
             path.reverse()
-            print(path)
+            if stats is not None:
+                stats.depth = len(path)
             return path
-        for movie_id, people_id in neighbors_for_person(node.state):
-            if people_id not in explored:
-                temp_node = Node(state = people_id, parent = node, action = movie_id)
+        neighbors = graph.neighbors(node.state)
+        if stats is not None:
+            neighbors = list(neighbors)
+            stats.nodes_expanded += 1
+            stats.edges_scanned += len(neighbors)
+        for movie, person in neighbors:
+            if person not in explored:
+                temp_node = Node(state = person, parent = node, action = movie)
                 frontier.add(temp_node)
-                explored.add(temp_node)
+                explored.add(person)
+
+
+def bidirectional_search(source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs from source
+    to target by searching forward from the source and backward from the
+    target at the same time, or None.
+
+    Each step expands one whole level of whichever frontier is smaller,
+    so the search stays close to the sparse end of the graph.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie, person) it was reached from
+    forward = {source: None}
+    backward = {target: None}
+    forward_movies = set()
+    backward_movies = set()
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if stats is not None:
+            stats.frontier_size(len(forward_frontier) + len(backward_frontier))
+            stats.depth += 1
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_level(
+                forward_frontier, forward, forward_movies, backward, stats
+            )
+        else:
+            backward_frontier, meeting = expand_level(
+                backward_frontier, backward, backward_movies, forward, stats
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+    return None
+
+
+def expand_level(frontier, parents, seen_movies, other_parents, stats=None):
+    """
+    Expands every person in frontier by one step, recording parents.
+    A movie's cast is only scanned the first time one side reaches it.
+    Counts are added to stats if it is given.
+
+    Returns the next frontier and the first person already reached by the
+    other search, or None if the two searches have not met yet.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    next_frontier = []
+    for person in frontier:
+        if stats is not None:
+            stats.nodes_expanded += 1
+            stats.edges_scanned += person_offsets[person + 1] - person_offsets[person]
+        for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+            if movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            if stats is not None:
+                stats.edges_scanned += movie_offsets[movie + 1] - movie_offsets[movie]
+            for neighbor in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (movie, person)
+                if neighbor in other_parents:
+                    return next_frontier, neighbor
+                next_frontier.append(neighbor)
+    return next_frontier, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the forward and backward parent chains through the meeting
+    person into a list of (movie, person) pairs.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, parent = backward[person]
+        path.append((movie, parent))
+        person = parent
+    return path
+
+
+def print_stats(stats):
+    print(
+        f"{stats.method}: {stats.nodes_expanded:,} people expanded, "
+        f"{stats.edges_scanned:,} edges scanned, peak frontier {stats.peak_frontier:,}, "
+        f"depth {stats.depth}",
+        file=sys.stderr
+    )
+    print(
+        f"load {stats.load_time:.3f}s, resolve {stats.resolve_time * 1000:.3f}ms, "
+        f"lookup {stats.lookup_time * 1000:.3f}ms, search {stats.search_time * 1000:.3f}ms",
+        file=sys.stderr
+    )
+
 
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If no name matches exactly, names that only differ in accents
+    or punctuation are tried. The time spent looking the name up, not
+    waiting for input, is added to resolve_time.
     """
+    global resolve_time
+    start = time.perf_counter()
     person_ids = list(names.get(name.lower(), set()))
+    if len(person_ids) == 0:
+        person_ids = [candidate.person_id for candidate in name_index.lookup(name)]
+    resolve_time += time.perf_counter() - start
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -148,12 +505,13 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    person = graph.find_person(person_id)
+    if person is None:
+        raise KeyError(person_id)
+    return {
+        (graph.movie_ids[movie], graph.person_ids[star])
+        for movie, star in graph.neighbors(person)
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+import csv
+import itertools
+import os
+import random
+import sys
+
+FIRST_NAMES = (
+    "Ada", "Alan", "Amara", "Ana", "Ben", "Carla", "Chen", "Dana", "David", "Elena",
+    "Emma", "Felix", "Grace", "Hana", "Ivan", "James", "Jose", "Julia", "Kai", "Karen",
+    "Leo", "Lucia", "Maria", "Mateo", "Mei", "Nina", "Omar", "Priya", "Rosa", "Sam",
+    "Sofia", "Tom", "Yara", "Zoë"
+)
+
+LAST_NAMES = (
+    "Almeida", "Brown", "Chen", "Cruz", "Dubois", "García", "Hansen", "Ito", "Jones", "Khan",
+    "Kim", "Kowalski", "Lee", "Martin", "Müller", "Nguyen", "O'Brien", "Patel", "Rossi", "Santos",
+    "Schmidt", "Silva", "Smith", "Tanaka", "Taylor", "Walker", "Wang", "Williams", "Young", "Zhang"
+)
+
+# Exponent of the power laws that cast sizes and people's popularity follow
+CAST_EXPONENT = 1.6
+POPULARITY_EXPONENT = 0.8
+
+# Average number of star rows per person, as in the IMDb data
+EDGES_PER_PERSON = 3
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python generate.py directory edges [seed]")
+    directory = sys.argv[1]
+    edges = int(float(sys.argv[2]))
+    seed = int(sys.argv[3]) if len(sys.argv) == 4 else 0
+
+    people, movies, edges = generate(directory, edges, seed)
+    print(f"Wrote {people:,} people, {movies:,} movies and {edges:,} stars to {directory}")
+
+
+def generate(directory, edges, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv to directory with about
+    edges star rows, the same way every time for a given seed.
+
+    Cast sizes follow a power law, so most movies have a few stars and
+    a few have hundreds, and stars are drawn from people whose popularity
+    also follows a power law, so a handful of people appear everywhere and
+    join the graph into one large component, as in the IMDb data.
+
+    Returns the number of people, movies and star rows written.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    person_count = max(edges // EDGES_PER_PERSON, 2)
+
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(person_count):
+            writer.writerow([person_id(person), random_name(rng), random_year(rng, 1900, 2010)])
+
+    # People in a random order, weighted by a power law of their rank
+    ranking = list(range(person_count))
+    rng.shuffle(ranking)
+    weights = list(itertools.accumulate(
+        (rank + 1) ** -POPULARITY_EXPONENT for rank in range(person_count)
+    ))
+
+    movie_count = 0
+    written = 0
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as movies_file, \
+            open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as stars_file:
+        movies = csv.writer(movies_file)
+        stars = csv.writer(stars_file)
+        movies.writerow(["id", "title", "year"])
+        stars.writerow(["person_id", "movie_id"])
+        while written < edges:
+            movie = movie_id(movie_count)
+            movies.writerow([movie, f"Movie {movie_count + 1}", random_year(rng, 1920, 2024)])
+            movie_count += 1
+
+            size = min(int(rng.paretovariate(CAST_EXPONENT)), edges - written, person_count)
+            cast = set()
+            while len(cast) < size:
+                cast.update(rng.choices(ranking, cum_weights=weights, k=size - len(cast)))
+            for person in cast:
+                stars.writerow([person_id(person), movie])
+            written += size
+    return person_count, movie_count, written
+
+
+def person_id(person):
+    return str(person + 1)
+
+
+def movie_id(movie):
+    return str(100000000 + movie)
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {chr(rng.randrange(65, 91))}. {rng.choice(LAST_NAMES)}"
+
+
+def random_year(rng, start, end):
+    # About one in ten years is unknown, as in the IMDb data
+    if rng.random() < 0.1:
+        return ""
+    return str(rng.randrange(start, end + 1))
+
+
+if __name__ == "__main__":
+    main()
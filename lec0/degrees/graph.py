@@ -0,0 +1,411 @@
+import itertools
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from components import component_labels
+
+
+class Graph():
+    """
+    Compact co-star graph with integer-indexed people and movies.
+
+    People and movies are numbered by their position in the sorted id
+    lists. Adjacency is stored in compressed-sparse-row form: the movies
+    of person p are person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and the stars of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+    person_component labels each person with a representative of their
+    connected component as of load time.
+
+    The graph can be edited in place. People and movies added after load
+    get the next free index, and removed ones keep their index with no
+    edges so every other index stays valid.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 name_order, person_component=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.name_order = name_order
+        if person_component is None:
+            person_component = component_labels(self)
+        self.person_component = person_component
+
+        # Ids past the sorted prefix were added after load
+        self.sorted_person_count = len(person_ids)
+        self.sorted_movie_count = len(movie_ids)
+        self.added_people = {}
+        self.added_movies = {}
+        self.removed_people = set()
+        self.removed_movies = set()
+
+    def person_count(self):
+        return len(self.person_offsets) - 1
+
+    def movie_count(self):
+        return len(self.movie_offsets) - 1
+
+    def edge_count(self):
+        return len(self.person_movies)
+
+    def find_person(self, person_id):
+        """
+        Returns the index of person_id, or None if it is not in the graph.
+        """
+        person = _find(self.person_ids, person_id, self.sorted_person_count)
+        if person is None:
+            person = self.added_people.get(person_id)
+        if person in self.removed_people:
+            return None
+        return person
+
+    def find_movie(self, movie_id):
+        """
+        Returns the index of movie_id, or None if it is not in the graph.
+        """
+        movie = _find(self.movie_ids, movie_id, self.sorted_movie_count)
+        if movie is None:
+            movie = self.added_movies.get(movie_id)
+        if movie in self.removed_movies:
+            return None
+        return movie
+
+    def movies_of(self, person):
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred with person.
+        """
+        for movie in self.movies_of(person):
+            for star in self.stars_of(movie):
+                yield movie, star
+
+    def make_writable(self):
+        """
+        Copies any memory-mapped columns into ordinary arrays and lists
+        so that the graph can be edited in place.
+        """
+        for name in ("person_offsets", "person_movies", "movie_offsets", "movie_stars", "name_order"):
+            values = getattr(self, name)
+            if not isinstance(values, array):
+                copy = array("i")
+                copy.frombytes(values.cast("B"))
+                setattr(self, name, copy)
+        for name in ("person_ids", "person_names", "person_births", "movie_ids", "movie_titles", "movie_years"):
+            values = getattr(self, name)
+            if not hasattr(values, "append"):
+                setattr(self, name, list(values))
+
+    def add_person(self, person_id, name, birth):
+        """
+        Adds a person with no movies and returns their index.
+        """
+        self.make_writable()
+        person = _find(self.person_ids, person_id, self.sorted_person_count)
+        if person is None:
+            person = self.added_people.get(person_id)
+        if person is not None:
+            if person not in self.removed_people:
+                raise ValueError(f"person {person_id} already exists")
+            self.removed_people.discard(person)
+            self.person_names[person] = name
+            self.person_births[person] = birth
+        else:
+            person = len(self.person_ids)
+            self.person_ids.append(person_id)
+            self.person_names.append(name)
+            self.person_births.append(birth)
+            self.person_offsets.append(self.person_offsets[-1])
+            self.added_people[person_id] = person
+        key = lambda other: self.person_names[other].lower()
+        self.name_order.insert(bisect_left(self.name_order, name.lower(), key=key), person)
+        return person
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Adds a movie with no stars and returns its index.
+        """
+        self.make_writable()
+        movie = _find(self.movie_ids, movie_id, self.sorted_movie_count)
+        if movie is None:
+            movie = self.added_movies.get(movie_id)
+        if movie is not None:
+            if movie not in self.removed_movies:
+                raise ValueError(f"movie {movie_id} already exists")
+            self.removed_movies.discard(movie)
+            self.movie_titles[movie] = title
+            self.movie_years[movie] = year
+        else:
+            movie = len(self.movie_ids)
+            self.movie_ids.append(movie_id)
+            self.movie_titles.append(title)
+            self.movie_years.append(year)
+            self.movie_offsets.append(self.movie_offsets[-1])
+            self.added_movies[movie_id] = movie
+        return movie
+
+    def add_star(self, person, movie):
+        """
+        Records that person starred in movie.
+        Returns False if that was already recorded.
+        """
+        self.make_writable()
+        if not _insert(self.person_offsets, self.person_movies, person, movie):
+            return False
+        _insert(self.movie_offsets, self.movie_stars, movie, person)
+        return True
+
+    def add_stars(self, pairs):
+        """
+        Records that each person starred in each movie of the (person, movie)
+        pairs, rebuilding the adjacency arrays once for the whole batch
+        instead of shifting them for every pair as add_star does.
+        Returns the pairs that were not already recorded.
+        """
+        self.make_writable()
+        by_person = {}
+        for person, movie in pairs:
+            by_person.setdefault(person, set()).add(movie)
+
+        added = []
+        person_additions = {}
+        movie_additions = {}
+        for person, movies in by_person.items():
+            new = sorted(
+                movie for movie in movies
+                if not _contains(self.person_offsets, self.person_movies, person, movie)
+            )
+            if not new:
+                continue
+            person_additions[person] = new
+            for movie in new:
+                movie_additions.setdefault(movie, []).append(person)
+                added.append((person, movie))
+
+        if added:
+            self.person_offsets, self.person_movies = _merge(
+                self.person_offsets, self.person_movies, person_additions
+            )
+            self.movie_offsets, self.movie_stars = _merge(
+                self.movie_offsets, self.movie_stars, movie_additions
+            )
+        return added
+
+    def remove_star(self, person, movie):
+        """
+        Forgets that person starred in movie.
+        Returns False if that was not recorded.
+        """
+        self.make_writable()
+        if not _delete(self.person_offsets, self.person_movies, person, movie):
+            return False
+        _delete(self.movie_offsets, self.movie_stars, movie, person)
+        return True
+
+    def remove_person(self, person):
+        """
+        Removes a person, who must have no movies left.
+        """
+        if self.person_offsets[person] != self.person_offsets[person + 1]:
+            raise ValueError("cannot remove a person who still has movies")
+        self.make_writable()
+        order = self.name_order
+        key = lambda other: self.person_names[other].lower()
+        i = bisect_left(order, self.person_names[person].lower(), key=key)
+        while order[i] != person:
+            i += 1
+        del order[i]
+        self.removed_people.add(person)
+
+    def remove_movie(self, movie):
+        """
+        Removes a movie, which must have no stars left.
+        """
+        if self.movie_offsets[movie] != self.movie_offsets[movie + 1]:
+            raise ValueError("cannot remove a movie that still has stars")
+        self.removed_movies.add(movie)
+
+
+class NamesView(Mapping):
+    """
+    Read-only mapping of lowercase names to a set of corresponding
+    person_ids, answered by binary search over graph.name_order.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.length = None
+
+    def key(self, person):
+        return self.graph.person_names[person].lower()
+
+    def __getitem__(self, name):
+        graph = self.graph
+        order = graph.name_order
+        i = bisect_left(order, name, key=self.key)
+        person_ids = set()
+        while i < len(order) and self.key(order[i]) == name:
+            person_ids.add(graph.person_ids[order[i]])
+            i += 1
+        if not person_ids:
+            raise KeyError(name)
+        return person_ids
+
+    def __iter__(self):
+        previous = None
+        for person in self.graph.name_order:
+            name = self.key(person)
+            if name != previous:
+                yield name
+                previous = name
+
+    def __len__(self):
+        if self.length is None:
+            self.length = sum(1 for _ in self)
+        return self.length
+
+
+class PeopleView(Mapping):
+    """
+    Read-only mapping of person_id to a dictionary of: name, birth,
+    movies (a set of movie_ids), built from a Graph on access.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        person = graph.find_person(person_id)
+        if person is None:
+            raise KeyError(person_id)
+        return {
+            "name": graph.person_names[person],
+            "birth": graph.person_births[person],
+            "movies": {graph.movie_ids[movie] for movie in graph.movies_of(person)}
+        }
+
+    def __contains__(self, person_id):
+        return self.graph.find_person(person_id) is not None
+
+    def __iter__(self):
+        removed = self.graph.removed_people
+        for person, person_id in enumerate(self.graph.person_ids):
+            if person not in removed:
+                yield person_id
+
+    def __len__(self):
+        return self.graph.person_count() - len(self.graph.removed_people)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only mapping of movie_id to a dictionary of: title, year,
+    stars (a set of person_ids), built from a Graph on access.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        movie = graph.find_movie(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
+        return {
+            "title": graph.movie_titles[movie],
+            "year": graph.movie_years[movie],
+            "stars": {graph.person_ids[person] for person in graph.stars_of(movie)}
+        }
+
+    def __contains__(self, movie_id):
+        return self.graph.find_movie(movie_id) is not None
+
+    def __iter__(self):
+        removed = self.graph.removed_movies
+        for movie, movie_id in enumerate(self.graph.movie_ids):
+            if movie not in removed:
+                yield movie_id
+
+    def __len__(self):
+        return self.graph.movie_count() - len(self.graph.removed_movies)
+
+
+def _find(ids, key, hi):
+    i = bisect_left(ids, key, 0, hi)
+    if i < hi and ids[i] == key:
+        return i
+    return None
+
+
+def _contains(offsets, values, row, value):
+    start, end = offsets[row], offsets[row + 1]
+    i = bisect_left(values, value, start, end)
+    return i < end and values[i] == value
+
+
+def _merge(offsets, values, additions):
+    """
+    Returns new CSR (offsets, values) with additions, a dict mapping rows
+    to lists of values not already in them, merged into their sorted rows.
+    Untouched stretches of rows are copied whole, so the cost is one pass
+    over the arrays however many values are added.
+    """
+    new_offsets = array("i")
+    new_values = array("i")
+    shift = 0
+    next_row = 0
+    next_value = 0
+    for row in sorted(additions):
+        start, end = offsets[row], offsets[row + 1]
+        new_offsets.extend(map(shift.__add__, offsets[next_row:row + 1]))
+        new_values.extend(values[next_value:start])
+        new_values.extend(sorted(itertools.chain(values[start:end], additions[row])))
+        shift += len(additions[row])
+        next_row = row + 1
+        next_value = end
+    new_offsets.extend(map(shift.__add__, offsets[next_row:]))
+    new_values.extend(values[next_value:])
+    return new_offsets, new_values
+
+
+def _insert(offsets, values, row, value):
+    """
+    Inserts value into the sorted CSR row, shifting the later offsets.
+    Returns False if the row already holds value.
+    """
+    start, end = offsets[row], offsets[row + 1]
+    i = bisect_left(values, value, start, end)
+    if i < end and values[i] == value:
+        return False
+    values.insert(i, value)
+    offsets[row + 1:] = array("i", [offset + 1 for offset in offsets[row + 1:]])
+    return True
+
+
+def _delete(offsets, values, row, value):
+    """
+    Deletes value from the sorted CSR row, shifting the later offsets.
+    Returns False if the row does not hold value.
+    """
+    start, end = offsets[row], offsets[row + 1]
+    i = bisect_left(values, value, start, end)
+    if i == end or values[i] != value:
+        return False
+    del values[i]
+    offsets[row + 1:] = array("i", [offset - 1 for offset in offsets[row + 1:]])
+    return True
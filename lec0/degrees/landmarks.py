@@ -0,0 +1,227 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+
+import snapshot
+from util import Node, PriorityFrontier
+
+# Bump whenever the layout written by save() changes
+INDEX_VERSION = 1
+
+INDEX_NAME = "landmarks.index"
+MAGIC = b"DEGLMRK\0"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few landmark people to everyone else,
+    packed one byte per person per landmark.
+
+    By the triangle inequality |d(L, t) - d(L, v)| never overestimates
+    d(v, t), so the largest such bound over all landmarks is an admissible
+    and consistent heuristic for A* search.
+    """
+
+    def __init__(self, landmarks, distances, person_count):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.person_count = person_count
+
+    @classmethod
+    def build(cls, graph, count=8):
+        """
+        Builds an index over the count people who appear in the most movies.
+        """
+        person_offsets = graph.person_offsets
+        by_degree = sorted(
+            range(graph.person_count()),
+            key=lambda person: person_offsets[person + 1] - person_offsets[person],
+            reverse=True
+        )
+        landmarks = by_degree[:count]
+        distances = array("B")
+        for landmark in landmarks:
+            distances.extend(bfs_distances(graph, landmark))
+        return cls(landmarks, distances, graph.person_count())
+
+    def heuristic(self, target):
+        """
+        Returns a function estimating the distance from a person to target.
+        """
+        n = self.person_count
+        distances = self.distances
+        bounds = []
+        for i in range(len(self.landmarks)):
+            to_target = distances[i * n + target]
+            if to_target != UNREACHABLE:
+                bounds.append((i * n, to_target))
+
+        def estimate(person):
+            best = 0
+            for start, to_target in bounds:
+                to_person = distances[start + person]
+                if to_person != UNREACHABLE:
+                    bound = abs(to_target - to_person)
+                    if bound > best:
+                        best = bound
+            return best
+        return estimate
+
+
+def astar_search(graph, index, source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs from source
+    to target using A* search guided by a LandmarkIndex, or None.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+    estimate = index.heuristic(target)
+
+    # Cost of the best known path to each person, and of the person each
+    # movie was first expanded from, so no cast is rescanned for nothing
+    cost = {source: 0}
+    movie_cost = {}
+    explored = set()
+
+    # Break ties towards deeper nodes, which are closer to the target
+    frontier = PriorityFrontier(key=lambda node: (cost[node.state] + estimate(node.state), -cost[node.state]))
+    frontier.add(Node(state=source, parent=None, action=None))
+
+    while not frontier.empty():
+        node = frontier.remove()
+        person = node.state
+        if person in explored:
+            continue
+        if person == target:
+            path = []
+            while node.parent is not None:
+                path.append((node.action, node.state))
+                node = node.parent
+            path.reverse()
+            return path
+        explored.add(person)
+
+        person_cost = cost[person]
+        next_cost = person_cost + 1
+        for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+            if movie_cost.get(movie, next_cost) <= person_cost:
+                continue
+            movie_cost[movie] = person_cost
+            for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                if star not in explored and next_cost < cost.get(star, next_cost + 1):
+                    cost[star] = next_cost
+                    frontier.add(Node(state=star, parent=node, action=movie))
+    return None
+
+
+def bfs_distances(graph, source):
+    """
+    Returns a byte array of breadth-first distances from source, capped
+    below UNREACHABLE.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    distances = array("B", [UNREACHABLE]) * graph.person_count()
+    seen_movies = bytearray(graph.movie_count())
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth = min(depth + 1, UNREACHABLE - 1)
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = depth
+                        next_frontier.append(star)
+        frontier = next_frontier
+    return distances
+
+
+def index_path(directory):
+    return os.path.join(directory, INDEX_NAME)
+
+
+def load(directory, graph):
+    """
+    Returns the LandmarkIndex memory-mapped from directory, or None if
+    there is none or it was built from different CSV files.
+    """
+    try:
+        f = open(index_path(directory), "rb")
+    except OSError:
+        return None
+    with f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        header_length = int.from_bytes(f.read(8), "little")
+        try:
+            header = json.loads(f.read(header_length))
+        except ValueError:
+            return None
+        if not isinstance(header, dict) or "sources" not in header or not isinstance(header.get("landmarks"), list):
+            return None
+        if header.get("version") != INDEX_VERSION or header.get("person_count") != graph.person_count():
+            return None
+
+        # An index cut short would send A* past the end of its distances
+        start = len(MAGIC) + 8 + header_length
+        if os.fstat(f.fileno()).st_size != start + len(header["landmarks"]) * graph.person_count():
+            return None
+        if not snapshot.sources_match(directory, header["sources"]):
+            return None
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    distances = memoryview(buffer)[start:]
+    return LandmarkIndex(header["landmarks"], distances, graph.person_count())
+
+
+def save(directory, index):
+    """
+    Writes index to directory, tagged with the CSV files it was built from.
+    """
+    header = json.dumps({
+        "version": INDEX_VERSION,
+        "person_count": index.person_count,
+        "landmarks": index.landmarks,
+        "sources": snapshot.source_signatures(directory)
+    }).encode("utf-8")
+    path = index_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(index.distances)
+    os.replace(temporary, path)
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else 8
+
+    import degrees
+    print("Loading data...")
+    degrees.load_data(directory)
+    print(f"Building index over {count} landmarks...")
+    save(directory, LandmarkIndex.build(degrees.graph, count))
+    print(f"Index written to {index_path(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import csv
+import io
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from graph import Graph
+
+# Rows read between two progress reports
+PROGRESS_INTERVAL = 100000
+
+# Size of stars.csv above which load_csv parses in worker processes
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+
+
+class YearColumn():
+    """
+    Column of year strings packed two bytes per row, with 0 standing for
+    a blank year. The rare value that is not a small positive integer is
+    kept as a string on the side.
+    """
+
+    def __init__(self):
+        self.years = array("H")
+        self.other = {}
+
+    def append(self, value):
+        self.years.append(0)
+        self[len(self.years) - 1] = value
+
+    def __setitem__(self, i, value):
+        self.other.pop(i, None)
+        if value.isdigit() and value[0] != "0" and int(value) < 65536:
+            self.years[i] = int(value)
+        else:
+            self.years[i] = 0
+            if value:
+                self.other[i] = sys.intern(value)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.years)
+        year = self.years[i]
+        if year:
+            return str(year)
+        return self.other.get(i, "")
+
+    def __len__(self):
+        return len(self.years)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def reorder(self, order):
+        """
+        Returns a new column holding this column's rows in the given order.
+        """
+        column = YearColumn()
+        column.years = array("H", [self.years[i] for i in order])
+        column.other = {new: self.other[old] for new, old in enumerate(order) if old in self.other}
+        return column
+
+
+def load_csv(directory, progress=None, processes=None):
+    """
+    Load data from CSV files into a Graph, one row at a time.
+
+    Rows are never held as dictionaries: ids are resolved to integer
+    indices as they are read, names and titles are interned, years are
+    packed into YearColumns, and star rows go straight into integer
+    arrays. progress, if given, is called as progress(file_name, rows)
+    every PROGRESS_INTERVAL rows and once at the end of each file.
+
+    When stars.csv is at least PARALLEL_THRESHOLD bytes, the files are
+    parsed by that many worker processes (default: one per CPU) with
+    load_csv_parallel; pass processes=1 to always load in this process.
+    """
+    stars_path = f"{directory}/stars.csv"
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes > 1 and os.path.getsize(stars_path) >= PARALLEL_THRESHOLD:
+        return load_csv_parallel(directory, progress, processes)
+
+    people = sort_columns(*read_people(directory, progress))
+    movies = sort_columns(*read_movies(directory, progress))
+    edges = read_stars(stars_path, people[0], movies[0], progress=progress)
+    return build_graph(people, movies, *edges)
+
+
+def load_csv_parallel(directory, progress, processes):
+    """
+    Load data from CSV files into a Graph using a pool of processes.
+
+    people.csv and movies.csv are parsed into columns side by side. Once
+    their ids are sorted, stars.csv is split into byte ranges that the
+    workers parse and resolve to index arrays, which are then merged.
+    """
+    with ProcessPoolExecutor(2) as executor:
+        people_future = executor.submit(read_people, directory)
+        movies_future = executor.submit(read_movies, directory)
+        people = sort_columns(*people_future.result())
+        report(progress, "people.csv", len(people[0]))
+        movies = sort_columns(*movies_future.result())
+        report(progress, "movies.csv", len(movies[0]))
+
+    stars_path = f"{directory}/stars.csv"
+    ranges = byte_ranges(stars_path, processes * 4)
+    edge_people = array("i")
+    edge_movies = array("i")
+    edges = 0
+    with ProcessPoolExecutor(processes, initializer=share_ids, initargs=(people[0], movies[0])) as executor:
+        for chunk_people, chunk_movies, chunk_edges in executor.map(read_star_range, ranges):
+            edge_people.frombytes(chunk_people)
+            edge_movies.frombytes(chunk_movies)
+            edges += chunk_edges
+            report(progress, "stars.csv", edges)
+    return build_graph(people, movies, edge_people, edge_movies)
+
+
+def read_people(directory, progress=None):
+    """
+    Returns the id, name and birth columns of people.csv in file order.
+    """
+    ids, names, births = [], [], YearColumn()
+    for row in read_rows(f"{directory}/people.csv", ("id", "name", "birth"), progress):
+        ids.append(row[0])
+        names.append(sys.intern(row[1]))
+        births.append(row[2])
+    return ids, names, births
+
+
+def read_movies(directory, progress=None):
+    """
+    Returns the id, title and year columns of movies.csv in file order.
+    """
+    ids, titles, years = [], [], YearColumn()
+    for row in read_rows(f"{directory}/movies.csv", ("id", "title", "year"), progress):
+        ids.append(row[0])
+        titles.append(sys.intern(row[1]))
+        years.append(row[2])
+    return ids, titles, years
+
+
+def sort_columns(ids, texts, years):
+    """
+    Returns the columns reordered by id, keeping the last row of each id.
+    """
+    order = sorted_order(ids)
+    return [ids[i] for i in order], [texts[i] for i in order], years.reorder(order)
+
+
+def read_stars(path, person_ids, movie_ids, start=0, end=None, progress=None):
+    """
+    Returns (edge_people, edge_movies) index arrays for the rows of
+    stars.csv whose person and movie both exist. start and end limit
+    reading to the lines that begin in that byte range.
+    """
+    edge_people = array("i")
+    edge_movies = array("i")
+    for row in read_rows(path, ("person_id", "movie_id"), progress, start, end):
+        person = find(person_ids, row[0])
+        movie = find(movie_ids, row[1])
+        if person is not None and movie is not None:
+            edge_people.append(person)
+            edge_movies.append(movie)
+    return edge_people, edge_movies
+
+
+def build_graph(people, movies, edge_people, edge_movies):
+    """
+    Returns a Graph from sorted people and movie columns and star edges.
+    """
+    person_ids, person_names, person_births = people
+    movie_ids, movie_titles, movie_years = movies
+    person_offsets, person_movies = compress(edge_people, edge_movies, len(person_ids))
+    movie_offsets, movie_stars = compress(edge_movies, edge_people, len(movie_ids))
+
+    name_order = array("i", sorted(
+        range(len(person_ids)), key=lambda person: person_names[person].lower()
+    ))
+    return Graph(
+        person_ids, person_names, person_births,
+        movie_ids, movie_titles, movie_years,
+        person_offsets, person_movies, movie_offsets, movie_stars,
+        name_order
+    )
+
+
+# Sorted person and movie ids, set in each worker by share_ids
+worker_ids = None
+
+
+def share_ids(person_ids, movie_ids):
+    global worker_ids
+    worker_ids = (person_ids, movie_ids)
+
+
+def read_star_range(byte_range):
+    """
+    Parses one byte range of stars.csv inside a worker, returning the
+    index arrays as bytes with the number of edges they hold.
+    """
+    path, start, end = byte_range
+    person_ids, movie_ids = worker_ids
+    edge_people, edge_movies = read_stars(path, person_ids, movie_ids, start, end)
+    return edge_people.tobytes(), edge_movies.tobytes(), len(edge_people)
+
+
+def byte_ranges(path, count):
+    """
+    Splits the file at path into about count (path, start, end) ranges.
+    """
+    size = os.path.getsize(path)
+    step = max(size // count, 1)
+    return [(path, start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def report(progress, name, rows):
+    if progress is not None:
+        progress(name, rows)
+
+
+def read_rows(path, columns, progress=None, start=0, end=None):
+    """
+    Yields the given columns of each row of a CSV file as lists.
+
+    If start or end is given, only the rows whose line begins at a byte
+    offset in [start, end) are read; the header is always skipped.
+    """
+    name = os.path.basename(path)
+    rows = 0
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]), [])
+        positions = [header.index(column) for column in columns]
+        if start > f.tell():
+            f.seek(start - 1)
+            f.readline()
+        if end is None:
+            lines = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        else:
+            data = f.read(max(end - f.tell(), 0)) if f.tell() < end else b""
+            if data and not data.endswith(b"\n"):
+                data += f.readline()
+            lines = io.StringIO(data.decode("utf-8"), newline="")
+        for row in csv.reader(lines):
+            if len(row) < len(header):
+                continue
+            yield [row[position] for position in positions]
+            rows += 1
+            if progress is not None and rows % PROGRESS_INTERVAL == 0:
+                progress(name, rows)
+    if progress is not None:
+        progress(name, rows)
+
+
+def sorted_order(ids):
+    """
+    Returns the row numbers of ids in sorted id order. When an id repeats,
+    only its last row is kept, as if later rows overwrote earlier ones.
+    """
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    return [
+        row for i, row in enumerate(order)
+        if i + 1 == len(order) or ids[order[i + 1]] != ids[row]
+    ]
+
+
+def compress(rows, columns, row_count):
+    """
+    Returns CSR (offsets, values) arrays for the (row, column) pairs,
+    with each row's values sorted and duplicates dropped.
+    """
+    counts = array("i", [0]) * (row_count + 1)
+    for row in rows:
+        counts[row + 1] += 1
+    for row in range(row_count):
+        counts[row + 1] += counts[row]
+
+    # Counting sort the pairs into place, then tidy up each row
+    cursor = array("i", counts)
+    values = array("i", [0]) * len(rows)
+    for row, column in zip(rows, columns):
+        values[cursor[row]] = column
+        cursor[row] += 1
+    del cursor
+
+    offsets = array("i", [0])
+    compact = array("i")
+    for row in range(row_count):
+        compact.extend(sorted(set(values[counts[row]:counts[row + 1]])))
+        offsets.append(len(compact))
+    return offsets, compact
+
+
+def find(ids, key):
+    i = bisect_left(ids, key)
+    if i < len(ids) and ids[i] == key:
+        return i
+    return None
+
+
+def print_progress(name, rows):
+    print(f"  {name}: {rows:,} rows", file=sys.stderr)
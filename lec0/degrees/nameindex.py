@@ -0,0 +1,113 @@
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+Candidate = namedtuple("Candidate", ["person_id", "name", "birth"])
+
+# Punctuation dropped outright, so "O'Brien" matches "OBrien"
+DROPPED = re.compile(r"['’.]")
+
+# Any other run of punctuation or spaces separates words
+SEPARATORS = re.compile(r"[\W_]+")
+
+
+class NameIndex():
+    """
+    Sorted index of every person's normalized name, for lookups that
+    never prompt: exact or prefix matches on the name with case, accents
+    and punctuation ignored, each answered by binary search.
+
+    The index is sorted the first time it is used, so loading a snapshot
+    stays fast for callers that never look a name up.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.keys = None
+        self.people = None
+
+    def build(self):
+        """
+        Sorts the index, unless it has been already. Long-running callers
+        such as server.py call this up front so that no lookup waits.
+        """
+        if self.keys is not None:
+            return
+        graph = self.graph
+        entries = sorted(
+            (normalize(name), person)
+            for person, name in enumerate(graph.person_names)
+            if person not in graph.removed_people
+        )
+        self.keys = [key for key, _ in entries]
+        self.people = array("i", [person for _, person in entries])
+
+    def lookup(self, name):
+        """
+        Returns a Candidate for each person whose name matches name.
+        """
+        self.build()
+        key = normalize(name)
+        return self.candidates(bisect_left(self.keys, key), bisect_right(self.keys, key))
+
+    def prefix(self, text, limit=None):
+        """
+        Returns a Candidate for each person whose name starts with text,
+        in name order, at most limit of them if limit is given.
+        """
+        self.build()
+        key = normalize(text)
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + "\U0010ffff", start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.candidates(start, end)
+
+    def resolve(self, names, prefix=False, limit=None):
+        """
+        Returns a dict mapping each of names to the list of Candidates it
+        could mean, matching whole names unless prefix is True.
+        """
+        if prefix:
+            return {name: self.prefix(name, limit) for name in names}
+        return {name: self.lookup(name) for name in names}
+
+    def candidates(self, start, end):
+        graph = self.graph
+        return [
+            Candidate(graph.person_ids[person], graph.person_names[person], graph.person_births[person])
+            for person in self.people[start:end]
+        ]
+
+    def add_person(self, person):
+        if self.keys is None:
+            return
+        key = normalize(self.graph.person_names[person])
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.people.insert(i, person)
+
+    def remove_person(self, person):
+        if self.keys is None:
+            return
+        key = normalize(self.graph.person_names[person])
+        i = bisect_left(self.keys, key)
+        while self.people[i] != person:
+            i += 1
+        del self.keys[i]
+        del self.people[i]
+
+
+def normalize(name):
+    """
+    Returns name in lowercase with accents and punctuation stripped and
+    single spaces between words.
+    """
+    if not name.isascii():
+        name = "".join(
+            c for c in unicodedata.normalize("NFKD", name)
+            if not unicodedata.combining(c)
+        )
+    return SEPARATORS.sub(" ", DROPPED.sub("", name.casefold())).strip()
@@ -0,0 +1,203 @@
+import heapq
+import itertools
+
+
+class LayeredDag():
+    """
+    Every shortest path from source to target, kept as the breadth-first
+    search layers between them: each person on a shortest path maps to
+    the (movie, person) steps that reach them from one layer closer to
+    source. People who lead nowhere near target are pruned away.
+    """
+
+    def __init__(self, graph, source, target):
+        self.source = source
+        self.target = target
+        self.predecessors = {}
+        self.layers = []
+        self.build(graph)
+
+    def build(self, graph):
+        person_offsets = graph.person_offsets
+        person_movies = graph.person_movies
+        movie_offsets = graph.movie_offsets
+        movie_stars = graph.movie_stars
+
+        depth = {self.source: 0}
+        predecessors = {self.source: []}
+        seen_movies = set()
+        frontier = [self.source]
+        while frontier and self.target not in depth:
+            # Group this layer by movie, so each cast is scanned once
+            reached = {}
+            for person in frontier:
+                for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+                    if movie not in seen_movies:
+                        reached.setdefault(movie, []).append(person)
+            seen_movies.update(reached)
+
+            next_depth = len(self.layers) + 1
+            next_frontier = []
+            for movie, parents in reached.items():
+                for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                    if star not in depth:
+                        depth[star] = next_depth
+                        predecessors[star] = []
+                        next_frontier.append(star)
+                    if depth[star] == next_depth:
+                        predecessors[star].extend((movie, parent) for parent in parents)
+            self.layers.append(frontier)
+            frontier = next_frontier
+
+        if self.target not in depth:
+            self.layers = []
+            return
+
+        # Keep only the people that some shortest path runs through
+        self.layers = [[self.target]]
+        self.predecessors = {self.target: predecessors[self.target]}
+        while self.layers[-1] != [self.source]:
+            layer = []
+            for person in self.layers[-1]:
+                for _, parent in predecessors[person]:
+                    if parent not in self.predecessors:
+                        self.predecessors[parent] = predecessors[parent]
+                        layer.append(parent)
+            self.layers.append(layer)
+        self.layers.reverse()
+
+    def distance(self):
+        """
+        Returns the number of degrees from source to target, or None.
+        """
+        if not self.layers:
+            return None
+        return len(self.layers) - 1
+
+    def count(self):
+        """
+        Returns the number of shortest paths without listing them.
+        """
+        if not self.layers:
+            return 0
+        counts = {self.source: 1}
+        for layer in self.layers[1:]:
+            for person in layer:
+                counts[person] = sum(counts[parent] for _, parent in self.predecessors[person])
+        return counts[self.target]
+
+    def paths(self):
+        """
+        Yields each shortest path as a list of (movie, person) index
+        pairs, one at a time.
+        """
+        if not self.layers:
+            return
+        if self.source == self.target:
+            yield []
+            return
+
+        # Depth-first walk back from target, holding the path in reverse
+        suffix = []
+        stack = [iter(self.predecessors[self.target])]
+        people = [self.target]
+        while stack:
+            step = next(stack[-1], None)
+            if step is None:
+                stack.pop()
+                people.pop()
+                if suffix:
+                    suffix.pop()
+                continue
+            movie, parent = step
+            suffix.append((movie, people[-1]))
+            if parent == self.source:
+                yield suffix[::-1]
+                suffix.pop()
+            else:
+                stack.append(iter(self.predecessors[parent]))
+                people.append(parent)
+
+
+def simple_paths(graph, source, target):
+    """
+    Yields the paths from source to target that never revisit a person,
+    shortest first, as lists of (movie, person) index pairs.
+
+    Every shortest path comes straight from a LayeredDag; longer paths
+    follow by Yen's algorithm, each one a deviation from a path already
+    yielded, found with a breadth-first search that avoids its prefix.
+    """
+    found = []
+    for path in LayeredDag(graph, source, target).paths():
+        found.append(tuple(path))
+        yield path
+    if not found or source == target:
+        return
+
+    yielded = set(found)
+    candidates = []
+    counter = itertools.count()
+    k = 0
+    while k < len(found):
+        path = found[k]
+        k += 1
+        people = [source] + [person for _, person in path]
+        for i in range(len(path)):
+            root = path[:i]
+            banned_steps = {other[i] for other in found if len(other) > i and other[:i] == root}
+            spur = restricted_search(graph, people[i], target, set(people[:i]), banned_steps)
+            if spur is None:
+                continue
+            candidate = root + tuple(spur)
+            if candidate not in yielded:
+                yielded.add(candidate)
+                heapq.heappush(candidates, (len(candidate), next(counter), candidate))
+
+        if k == len(found) and candidates:
+            _, _, candidate = heapq.heappop(candidates)
+            found.append(candidate)
+            yield list(candidate)
+
+
+def restricted_search(graph, source, target, banned_people, banned_steps):
+    """
+    Returns the shortest list of (movie, person) index pairs from source
+    to target that visits none of banned_people and does not start with
+    any of banned_steps, or None.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    parents = {person: None for person in banned_people}
+    parents[source] = None
+    seen_movies = set()
+    frontier = [source]
+    first = True
+    while frontier:
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+                if movie in seen_movies:
+                    continue
+                # A banned first step must not hide the rest of its cast
+                if not first:
+                    seen_movies.add(movie)
+                for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                    if star in parents or (first and (movie, star) in banned_steps):
+                        continue
+                    parents[star] = (movie, person)
+                    if star == target:
+                        path = []
+                        while star != source:
+                            movie, parent = parents[star]
+                            path.append((movie, star))
+                            star = parent
+                        path.reverse()
+                        return path
+                    next_frontier.append(star)
+        frontier = next_frontier
+        first = False
+    return None
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import batch
+import degrees
+
+# Pool of worker processes that run the searches
+pool = None
+
+# Prefix matches returned when no limit is given, and at most
+PREFIX_LIMIT = 20
+MAX_PREFIX_LIMIT = 200
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python server.py directory [port] [processes]")
+    directory = sys.argv[1]
+    port = int(sys.argv[2]) if len(sys.argv) >= 3 else 8050
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    print("Loading data...")
+    degrees.load_data(directory)
+
+    # Sort the name index now, since sorting it on the first lookup would
+    # block the event loop and every client with it
+    degrees.name_index.build()
+    print("Data loaded.")
+    try:
+        asyncio.run(serve(directory, port, processes))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve(directory, port, processes=None):
+    """
+    Answers HTTP requests on localhost:port until cancelled:
+
+        GET /path?source=...&target=...   shortest path between two people
+        GET /person?name=...              people with a given name
+        GET /person?name=...&prefix=1     people whose name starts with it,
+                                          at most limit=... of them (default
+                                          20, at most 200)
+
+    source and target may be person ids or unambiguous names. Searches
+    run in a process pool that shares the loaded graph, so one slow query
+    does not hold up the others.
+    """
+    global pool
+    if "fork" in multiprocessing.get_all_start_methods():
+        pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork"))
+    else:
+        pool = ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context("spawn"),
+            initializer=degrees.load_data, initargs=(directory,)
+        )
+    with pool:
+        server = await asyncio.start_server(handle, "127.0.0.1", port)
+        print(f"Serving on http://127.0.0.1:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+async def handle(reader, writer):
+    """
+    Answers one HTTP request and reports how long it took.
+    """
+    start = time.perf_counter()
+    request_line = []
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        while (await reader.readline()).strip():
+            pass
+        if len(request_line) != 3:
+            status, body = HTTPStatus.BAD_REQUEST, {"error": "Malformed request."}
+        elif request_line[0] != "GET":
+            status, body = HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported."}
+        else:
+            url = urlsplit(request_line[1])
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            status, body = await route(url.path, query)
+    except Exception as error:
+        status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+
+    elapsed = (time.perf_counter() - start) * 1000
+    body["elapsed_ms"] = round(elapsed, 3)
+    payload = json.dumps(body).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Server-Timing: total;dur={elapsed:.3f}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + payload
+    )
+    await writer.drain()
+    writer.close()
+    print(f"{' '.join(request_line[:2])} {status.value} {elapsed:.1f} ms", file=sys.stderr)
+
+
+async def route(path, query):
+    """
+    Returns the (status, body) for a request path and its query parameters.
+    """
+    if path == "/path":
+        if "source" not in query or "target" not in query:
+            return HTTPStatus.BAD_REQUEST, {"error": "source and target are required."}
+        return await find_path(query["source"], query["target"])
+    if path == "/person":
+        if "name" not in query:
+            return HTTPStatus.BAD_REQUEST, {"error": "name is required."}
+        limit = int(query["limit"]) if query.get("limit", "").isdigit() else PREFIX_LIMIT
+        return find_people(query["name"], query.get("prefix") in ("1", "true"), limit)
+    return HTTPStatus.NOT_FOUND, {"error": f"No route for {path}."}
+
+
+async def find_path(source, target):
+    source_id = batch.resolve(source)
+    target_id = batch.resolve(target)
+    if source_id is None or target_id is None:
+        return HTTPStatus.NOT_FOUND, {"error": "Person not found."}
+
+    loop = asyncio.get_running_loop()
+    _, _, path, _ = await loop.run_in_executor(pool, batch.solve, (source_id, target_id))
+    body = {"source": source_id, "target": target_id, "degrees": None, "path": None}
+    if path is not None:
+        body["degrees"] = len(path)
+        body["path"] = [
+            {
+                "movie_id": movie_id,
+                "title": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "name": degrees.people[person_id]["name"]
+            }
+            for movie_id, person_id in path
+        ]
+    return HTTPStatus.OK, body
+
+
+def find_people(name, prefix=False, limit=PREFIX_LIMIT):
+    # Lookups run on the event loop, so a short prefix must not list and
+    # encode a large share of everyone while other clients wait
+    if prefix:
+        candidates = degrees.name_index.prefix(name, min(limit, MAX_PREFIX_LIMIT))
+    else:
+        candidates = degrees.name_index.lookup(name)
+    return HTTPStatus.OK, {"name": name, "people": [candidate._asdict() for candidate in candidates]}
+
+
+if __name__ == "__main__":
+    main()
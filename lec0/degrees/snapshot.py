@@ -0,0 +1,239 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+from array import array
+
+from graph import Graph
+
+# Bump whenever the layout written by save() changes
+SNAPSHOT_VERSION = 2
+
+SNAPSHOT_NAME = "degrees.snapshot"
+SOURCE_FILES = ("people.csv", "movies.csv", "stars.csv")
+MAGIC = b"DEGSNAP\0"
+
+# Graph attributes stored as integer arrays and as string columns
+ARRAY_FIELDS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars", "name_order", "person_component"
+)
+STRING_FIELDS = ("person_ids", "person_names", "person_births", "movie_ids", "movie_titles", "movie_years")
+
+
+class StringColumn():
+    """
+    Read-only sequence of strings stored as one UTF-8 blob plus an array
+    of offsets, decoded one item at a time on access.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string column index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def load(directory):
+    """
+    Returns a Graph memory-mapped from the snapshot in directory,
+    or None if there is no snapshot or it no longer matches the CSV files.
+    """
+    try:
+        f = open(snapshot_path(directory), "rb")
+    except OSError:
+        return None
+    with f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        header_length = int.from_bytes(f.read(8), "little")
+        try:
+            header = json.loads(f.read(header_length))
+        except ValueError:
+            return None
+        if not isinstance(header, dict) or "sources" not in header or "sections" not in header:
+            return None
+        if header.get("version") != SNAPSHOT_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+
+        # A snapshot cut short must not be mapped, or its columns come out short
+        start = len(MAGIC) + 8 + header_length
+        end = sections_end(header["sections"])
+        if end is None or os.fstat(f.fileno()).st_size < start + end:
+            return None
+        if not sources_match(directory, header["sources"]):
+            return None
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Record the new mtimes of CSV files that were only touched, so the
+    # next load does not hash them again
+    if refresh_mtimes(directory, header["sources"]):
+        rewrite_header(directory, header, header_length)
+
+    # Sections are laid out right after the header, which is padded to 8 bytes
+    data = memoryview(buffer)[start:]
+    sections = header["sections"]
+
+    def section(name):
+        typecode, offset, length = sections[name]
+        view = data[offset:offset + length]
+        return view if typecode == "B" else view.cast(typecode)
+
+    fields = {name: section(name) for name in ARRAY_FIELDS}
+    for name in STRING_FIELDS:
+        fields[name] = StringColumn(section(name + ".blob"), section(name + ".offsets"))
+    return Graph(**fields)
+
+
+def sections_end(sections):
+    """
+    Returns the offset past the last of the sections a Graph needs,
+    or None if any of them is missing or malformed.
+    """
+    names = list(ARRAY_FIELDS)
+    for name in STRING_FIELDS:
+        names += [name + ".blob", name + ".offsets"]
+    try:
+        return max(sections[name][1] + sections[name][2] for name in names)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def rewrite_header(directory, header, header_length):
+    """
+    Rewrites the header of the snapshot in directory in place, padded
+    to its old length so that the sections stay where they are.
+    Leaves the snapshot alone if the new header would not fit.
+    """
+    encoded = json.dumps(header).encode("utf-8")
+    if len(encoded) > header_length:
+        return
+    try:
+        with open(snapshot_path(directory), "r+b") as f:
+            f.seek(len(MAGIC) + 8)
+            f.write(encoded + b" " * (header_length - len(encoded)))
+    except OSError:
+        pass
+
+
+def save(directory, graph):
+    """
+    Writes graph to a snapshot in directory, tagged with the size,
+    modification time and hash of the CSV files it was built from.
+    """
+    sections = []
+    for name in ARRAY_FIELDS:
+        values = getattr(graph, name)
+        sections.append((name, "i", array("i", values).tobytes()))
+    for name in STRING_FIELDS:
+        encoded = [value.encode("utf-8") for value in getattr(graph, name)]
+        offsets = array("q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        sections.append((name + ".blob", "B", b"".join(encoded)))
+        sections.append((name + ".offsets", "q", offsets.tobytes()))
+
+    # Lay the sections out after the header, each aligned to 8 bytes
+    layout = {}
+    position = 0
+    for name, typecode, data in sections:
+        layout[name] = [typecode, position, len(data)]
+        position += len(data) + (-len(data) % 8)
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "sources": source_signatures(directory),
+        "sections": layout
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, typecode, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(temporary, path)
+
+
+def source_signatures(directory):
+    """
+    Returns the size, modification time and hash of each CSV file.
+    """
+    signatures = {}
+    for name in SOURCE_FILES:
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        signatures[name] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": file_hash(path)
+        }
+    return signatures
+
+
+def sources_match(directory, signatures):
+    """
+    Returns True if the CSV files still match their recorded signatures.
+    Files whose size and mtime are unchanged are trusted without hashing.
+    """
+    if not isinstance(signatures, dict):
+        return False
+    for name in SOURCE_FILES:
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        signature = signatures.get(name)
+        if not isinstance(signature, dict) or stat.st_size != signature.get("size"):
+            return False
+        if stat.st_mtime_ns != signature.get("mtime") and file_hash(path) != signature.get("hash"):
+            return False
+    return True
+
+
+def refresh_mtimes(directory, signatures):
+    """
+    Updates signatures, which sources_match has accepted, with the
+    current mtime of each CSV file. Returns True if any had changed,
+    as when a file was touched without changing its contents.
+    """
+    changed = False
+    for name in SOURCE_FILES:
+        try:
+            mtime = os.stat(os.path.join(directory, name)).st_mtime_ns
+        except OSError:
+            return False
+        if signatures[name]["mtime"] != mtime:
+            signatures[name]["mtime"] = mtime
+            changed = True
+    return changed
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
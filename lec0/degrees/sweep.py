@@ -0,0 +1,101 @@
+import sys
+
+import numpy as np
+from scipy import sparse
+
+
+def incidence_matrices(graph):
+    """
+    Returns the person-by-movie incidence matrix of graph and its
+    transpose as CSR matrices that share the graph's adjacency buffers.
+    """
+    person_by_movie = sparse.csr_matrix(
+        (
+            np.ones(graph.edge_count(), dtype=bool),
+            np.asarray(graph.person_movies),
+            np.asarray(graph.person_offsets)
+        ),
+        shape=(graph.person_count(), graph.movie_count())
+    )
+    movie_by_person = sparse.csr_matrix(
+        (
+            np.ones(len(graph.movie_stars), dtype=bool),
+            np.asarray(graph.movie_stars),
+            np.asarray(graph.movie_offsets)
+        ),
+        shape=(graph.movie_count(), graph.person_count())
+    )
+    return person_by_movie, movie_by_person
+
+
+def sweep(graph, source):
+    """
+    Returns (distance, parent_person, parent_movie) arrays over every
+    person in graph for a breadth-first search from source, expanding
+    each whole level with two sparse matrix-vector products.
+
+    People source cannot reach have distance -1 and parents of -1.
+    """
+    person_by_movie, movie_by_person = incidence_matrices(graph)
+
+    distance = np.full(graph.person_count(), -1, dtype=np.int32)
+    parent_person = np.full(graph.person_count(), -1, dtype=np.int32)
+    parent_movie = np.full(graph.person_count(), -1, dtype=np.int32)
+    movie_parent = np.full(graph.movie_count(), -1, dtype=np.int32)
+    seen_movies = np.zeros(graph.movie_count(), dtype=bool)
+
+    distance[source] = 0
+    frontier = np.zeros(graph.person_count(), dtype=bool)
+    frontier[source] = True
+    depth = 0
+    while True:
+        depth += 1
+
+        # Movies any frontier person starred in that no earlier level reached
+        new_movies = movie_by_person @ frontier & ~seen_movies
+        if not new_movies.any():
+            break
+        seen_movies |= new_movies
+        movies = np.flatnonzero(new_movies)
+        movie_parent[movies] = masked_row_max(movie_by_person, movies, frontier)
+
+        # People in those movies that no earlier level reached
+        frontier = person_by_movie @ new_movies & (distance == -1)
+        people = np.flatnonzero(frontier)
+        if len(people) == 0:
+            break
+        distance[people] = depth
+        parent_movie[people] = masked_row_max(person_by_movie, people, new_movies)
+        parent_person[people] = movie_parent[parent_movie[people]]
+    return distance, parent_person, parent_movie
+
+
+def masked_row_max(matrix, rows, mask):
+    """
+    Returns, for each of rows of the CSR matrix, the largest column in
+    that row for which mask is set. Every row must have one.
+    """
+    block = matrix[rows]
+    columns = np.where(mask[block.indices], block.indices, -1)
+    return np.maximum.reduceat(columns, block.indptr[:-1])
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python sweep.py directory person_id")
+
+    import degrees
+    degrees.load_data(sys.argv[1])
+    source = degrees.graph.find_person(sys.argv[2])
+    if source is None:
+        sys.exit("Person not found.")
+
+    distance, _, _ = sweep(degrees.graph, source)
+    counts = np.bincount(distance[distance >= 0])
+    for depth, count in enumerate(counts):
+        print(f"{depth}: {count}")
+    print(f"Not connected: {np.count_nonzero(distance < 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from collections import Counter
+
+import batch
+import degrees
+import generate
+
+
+def test_solve_reports_why_there_is_no_path(tmp_path):
+    generate.generate(tmp_path, 3000, seed=6)
+    degrees.tree_cache = None
+    degrees.load_data(str(tmp_path))
+    counts = Counter(degrees.people[person_id]["name"] for person_id in degrees.people)
+    shared = next(name for name, count in counts.items() if count > 1)
+    unique = next(name for name, count in counts.items() if count == 1)
+    person_ids = sorted(degrees.people)
+
+    assert batch.solve((shared, unique))[2:] == (None, "ambiguous")
+    assert batch.solve((unique, "No Such Person"))[2:] == (None, "not_found")
+    assert batch.solve((person_ids[0], person_ids[0])) == (person_ids[0], person_ids[0], [], "ok")
+
+    statuses = set()
+    for target in person_ids[:200]:
+        _, _, path, status = batch.solve((person_ids[0], target))
+        assert (path is None) == (status == "not_connected")
+        statuses.add(status)
+    assert statuses == {"ok", "not_connected"}
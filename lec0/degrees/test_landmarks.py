@@ -0,0 +1,62 @@
+import json
+import os
+import random
+
+import degrees
+import generate
+import landmarks
+
+
+def test_astar_paths_match_default_search(tmp_path):
+    generate.generate(tmp_path, 3000, seed=6)
+    degrees.tree_cache = None
+    degrees.landmark_index = None
+    degrees.load_data(str(tmp_path))
+    graph = degrees.graph
+    index = landmarks.LandmarkIndex.build(graph)
+    person_ids = sorted(degrees.people)
+    rng = random.Random(4)
+
+    disconnected = 0
+    for _ in range(300):
+        source, target = rng.choice(person_ids), rng.choice(person_ids)
+        expected = degrees.shortest_path(source, target)
+        path = landmarks.astar_search(graph, index, graph.find_person(source), graph.find_person(target))
+        if expected is None:
+            disconnected += 1
+            assert path is None
+            continue
+        assert len(path) == len(expected)
+        person = graph.find_person(source)
+        for movie, next_person in path:
+            assert person in graph.stars_of(movie) and next_person in graph.stars_of(movie)
+            person = next_person
+        assert person == graph.find_person(target)
+
+        # shortest_path answers with A* once the index is set
+        degrees.landmark_index = index
+        assert len(degrees.shortest_path(source, target)) == len(expected)
+        degrees.landmark_index = None
+    assert disconnected > 0
+
+
+def test_truncated_or_malformed_index_is_ignored(tmp_path):
+    generate.generate(tmp_path, 2000, seed=4)
+    directory = str(tmp_path)
+    degrees.load_data(directory)
+    landmarks.save(directory, landmarks.LandmarkIndex.build(degrees.graph))
+    assert landmarks.load(directory, degrees.graph) is not None
+
+    path = landmarks.index_path(directory)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:len(data) // 2])
+    assert landmarks.load(directory, degrees.graph) is None
+
+    for header in ([1, 2], {"version": landmarks.INDEX_VERSION, "landmarks": []}):
+        encoded = json.dumps(header).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(landmarks.MAGIC + len(encoded).to_bytes(8, "little") + encoded)
+        assert landmarks.load(directory, degrees.graph) is None
+    os.remove(path)
@@ -0,0 +1,68 @@
+import csv
+
+import pytest
+
+import generate
+import loader
+
+COLUMNS = (
+    "person_ids", "person_names", "person_births", "movie_ids", "movie_titles", "movie_years",
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars", "name_order", "person_component"
+)
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("data")
+    generate.generate(directory, 20000, seed=11)
+
+    # Rows the loaders must cope with: quoted commas, a repeated star row
+    # and stars of people and movies that do not exist
+    with open(directory / "movies.csv", "a", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerow(["tt-quoted", "Title, with \"quotes\"", ""])
+    with open(directory / "stars.csv", "a", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["1", "tt-quoted"])
+        writer.writerow(["1", "tt-quoted"])
+        writer.writerow(["nobody", "tt-quoted"])
+        writer.writerow(["1", "no-movie"])
+    return str(directory)
+
+
+def columns(graph):
+    return {name: list(getattr(graph, name)) for name in COLUMNS}
+
+
+@pytest.mark.parametrize("processes", [2, 3, 7])
+def test_parallel_loader_builds_the_same_graph(directory, processes):
+    serial = loader.load_csv(directory, processes=1)
+    parallel = loader.load_csv_parallel(directory, None, processes)
+    assert columns(parallel) == columns(serial)
+
+
+def test_loader_matches_dict_reader(directory):
+    people = {}
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            people[row["id"]] = (row["name"], row["birth"], set())
+    movies = {}
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            movies[row["id"]] = (row["title"], row["year"], set())
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row["person_id"] in people and row["movie_id"] in movies:
+                people[row["person_id"]][2].add(row["movie_id"])
+                movies[row["movie_id"]][2].add(row["person_id"])
+
+    graph = loader.load_csv(directory, processes=1)
+    assert list(graph.person_ids) == sorted(people)
+    assert list(graph.movie_ids) == sorted(movies)
+    for person, person_id in enumerate(graph.person_ids):
+        name, birth, credits = people[person_id]
+        assert (graph.person_names[person], graph.person_births[person]) == (name, birth)
+        assert {graph.movie_ids[movie] for movie in graph.movies_of(person)} == credits
+    for movie, movie_id in enumerate(graph.movie_ids):
+        title, year, stars = movies[movie_id]
+        assert (graph.movie_titles[movie], graph.movie_years[movie]) == (title, year)
+        assert {graph.person_ids[star] for star in graph.stars_of(movie)} == stars
@@ -0,0 +1,81 @@
+import pytest
+
+import degrees
+import generate
+import updates
+from nameindex import normalize
+
+
+@pytest.fixture
+def graph(tmp_path):
+    generate.generate(tmp_path, 3000, seed=6)
+    degrees.tree_cache = None
+    degrees.load_data(str(tmp_path))
+    return degrees.graph
+
+
+def scan(graph, match):
+    """
+    Returns the ids of every person whose normalized name satisfies match,
+    found by checking each name in turn.
+    """
+    return sorted(
+        graph.person_ids[person]
+        for person, name in enumerate(graph.person_names)
+        if person not in graph.removed_people and match(normalize(name))
+    )
+
+
+def ids(candidates):
+    return sorted(candidate.person_id for candidate in candidates)
+
+
+def test_normalize_ignores_case_accents_and_punctuation():
+    assert normalize("Müller") == "muller"
+    assert normalize("O'Brien") == normalize("O’Brien") == "obrien"
+    assert normalize("  Jean-Luc   PICARD ") == "jean luc picard"
+    assert normalize("J. R. Smith") == "j r smith"
+
+
+def test_lookup_and_prefix_match_a_scan(graph):
+    index = degrees.name_index
+    names = [name for name in graph.person_names if "Müller" in name or "O'Brien" in name]
+    assert names
+    for name in names[:20]:
+        key = normalize(name)
+        expected = scan(graph, lambda other: other == key)
+        assert ids(index.lookup(name)) == expected
+        assert ids(index.lookup(key)) == expected
+        assert ids(index.lookup(name.upper())) == expected
+
+    for text in ["muller", "Müll", "obrien", "O'B", "a"]:
+        key = normalize(text)
+        expected = scan(graph, lambda other: other.startswith(key))
+        assert ids(index.prefix(text)) == expected
+        limited = index.prefix(text, 5)
+        assert len(limited) == min(5, len(expected))
+        assert [normalize(candidate.name) for candidate in limited] == sorted(
+            normalize(candidate.name) for candidate in limited
+        )
+        assert set(ids(limited)) <= set(expected)
+
+
+def test_index_follows_added_and_removed_people(graph):
+    index = degrees.name_index
+    index.build()
+    updates.add_person("new-1", "Zoë O'Malley", "1990")
+    updates.add_person("new-2", "Zoe OMalley", "")
+    assert ids(index.lookup("zoe omalley")) == ["new-1", "new-2"]
+    assert ids(index.prefix("Zoë O’Mall")) == ["new-1", "new-2"]
+
+    updates.remove_person("new-1")
+    assert ids(index.lookup("Zoë O'Malley")) == ["new-2"]
+
+    person_id = index.lookup(graph.person_names[0])[0].person_id
+    name = degrees.people[person_id]["name"]
+    before = ids(index.lookup(name))
+    updates.remove_person(person_id)
+    assert ids(index.lookup(name)) == [other for other in before if other != person_id]
+    assert person_id not in ids(index.prefix(name))
+    assert index.keys == sorted(index.keys)
+    assert len(index.keys) == len(index.people) == graph.person_count() - len(graph.removed_people)
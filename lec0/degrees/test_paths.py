@@ -0,0 +1,141 @@
+import itertools
+import random
+
+import pytest
+
+import degrees
+import generate
+
+
+@pytest.fixture(scope="module")
+def person_ids(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("data")
+    generate.generate(directory, 1500, seed=8)
+    degrees.tree_cache = None
+    degrees.load_data(str(directory))
+    return sorted(degrees.people)
+
+
+def simple_paths(source, target, limit):
+    """
+    Returns every path from source to target of at most limit steps
+    that does not repeat a person, found by brute force.
+    """
+    found = []
+
+    def extend(person_id, path, seen):
+        if person_id == target:
+            found.append(tuple(path))
+            return
+        if len(path) == limit:
+            return
+        for movie_id, star in degrees.neighbors_for_person(person_id):
+            if star not in seen:
+                extend(star, path + [(movie_id, star)], seen | {star})
+    extend(source, [], {source})
+    return found
+
+
+def check_path(source, target, path):
+    person_id = source
+    seen = {source}
+    for movie_id, next_id in path:
+        stars = degrees.movies[movie_id]["stars"]
+        assert person_id in stars and next_id in stars
+        assert next_id not in seen
+        seen.add(next_id)
+        person_id = next_id
+    assert person_id == target
+
+
+def connected_pairs(person_ids, count, seed):
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        source, target = rng.choice(person_ids), rng.choice(person_ids)
+        if source != target and degrees.shortest_path(source, target) is not None:
+            pairs.append((source, target))
+    return pairs
+
+
+def test_count_matches_enumerated_shortest_paths(person_ids):
+    for source, target in connected_pairs(person_ids, 40, seed=1):
+        length = len(degrees.shortest_path(source, target))
+        paths = [tuple(path) for path in degrees.all_shortest_paths(source, target)]
+        assert len(paths) == len(set(paths)) == degrees.count_shortest_paths(source, target)
+        for path in paths:
+            assert len(path) == length
+            check_path(source, target, path)
+        if length <= 3:
+            assert set(paths) == {path for path in simple_paths(source, target, length) if len(path) == length}
+
+
+def test_k_shortest_paths_come_shortest_first(person_ids):
+    for source, target in connected_pairs(person_ids, 15, seed=2):
+        length = len(degrees.shortest_path(source, target))
+        if length > 2:
+            continue
+        paths = [tuple(path) for path in degrees.k_shortest_paths(source, target, 30)]
+        for path in paths:
+            check_path(source, target, path)
+        assert len(paths) == len(set(paths))
+        assert [len(path) for path in paths] == sorted(len(path) for path in paths)
+
+        # Every path shorter than the longest one returned must be among them
+        expected = simple_paths(source, target, len(paths[-1]) - 1)
+        assert set(expected) <= set(paths)
+        assert len(paths) == 30 or set(paths) == set(simple_paths(source, target, len(paths[-1])))
+
+
+def test_unconnected_pairs_have_no_paths(person_ids):
+    rng = random.Random(3)
+    for _ in itertools.repeat(None, 200):
+        source, target = rng.choice(person_ids), rng.choice(person_ids)
+        if degrees.shortest_path(source, target) is None:
+            assert list(degrees.all_shortest_paths(source, target)) == []
+            assert degrees.count_shortest_paths(source, target) == 0
+            assert list(degrees.k_shortest_paths(source, target, 5)) == []
+
+
+def test_shortest_paths_from_one_source(person_ids):
+    rng = random.Random(4)
+    source = rng.choice(person_ids)
+    targets = rng.sample(person_ids, 60) + ["no-such-person"]
+    found = degrees.shortest_paths(source, targets)
+    assert set(found) == set(targets)
+    for target in targets:
+        expected = degrees.shortest_path(source, target) if target in degrees.people else None
+        if expected is None:
+            assert found[target] is None
+        else:
+            assert len(found[target]) == len(expected)
+            check_path(source, target, found[target])
+
+    limited = degrees.shortest_paths(source, targets, max_depth=2)
+    for target in targets:
+        if found[target] is not None and len(found[target]) <= 2:
+            assert len(limited[target]) == len(found[target])
+        else:
+            assert limited[target] is None
+
+
+def test_nearest_sources_picks_a_closest_source(person_ids):
+    rng = random.Random(5)
+    sources = rng.sample(person_ids, 4)
+    targets = rng.sample(person_ids, 60) + ["no-such-person"]
+    nearest = degrees.nearest_sources(sources + ["no-such-person"], targets)
+    for target in targets:
+        distances = [
+            len(path) for path in (
+                degrees.shortest_path(source, target) if target in degrees.people else None
+                for source in sources
+            )
+            if path is not None
+        ]
+        if not distances:
+            assert nearest[target] is None
+            continue
+        source, path = nearest[target]
+        assert source in sources
+        assert len(path) == min(distances)
+        check_path(source, target, path)
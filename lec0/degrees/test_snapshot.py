@@ -0,0 +1,39 @@
+import os
+
+import degrees
+import generate
+import snapshot
+
+
+def test_truncated_snapshot_falls_back_to_csv(tmp_path):
+    generate.generate(tmp_path, 2000, seed=4)
+    directory = str(tmp_path)
+    degrees.load_data(directory)
+    expected = sorted(degrees.people)
+    path = snapshot.snapshot_path(directory)
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert snapshot.load(directory) is None
+    degrees.load_data(directory)
+    assert sorted(degrees.people) == expected
+
+    # load_data wrote a whole snapshot again
+    assert snapshot.load(directory) is not None
+
+
+def test_touched_csv_is_hashed_once(tmp_path, monkeypatch):
+    generate.generate(tmp_path, 2000, seed=4)
+    directory = str(tmp_path)
+    degrees.load_data(directory)
+    stars = os.path.join(directory, "stars.csv")
+    stat = os.stat(stars)
+    os.utime(stars, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    hashed = []
+    file_hash = snapshot.file_hash
+    monkeypatch.setattr(snapshot, "file_hash", lambda path: hashed.append(path) or file_hash(path))
+    assert snapshot.load(directory) is not None
+    assert hashed == [stars]
+    assert snapshot.load(directory) is not None
+    assert hashed == [stars]
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+import degrees
+import generate
+import sweep
+from trees import bfs_tree
+
+
+def test_sweep_matches_bfs_tree(tmp_path):
+    generate.generate(tmp_path, 5000, seed=2)
+    degrees.load_data(str(tmp_path))
+    graph = degrees.graph
+    rng = random.Random(0)
+    hub = max(range(graph.person_count()), key=lambda person: len(graph.movies_of(person)))
+
+    for source in [hub] + [rng.randrange(graph.person_count()) for _ in range(5)]:
+        distance, parent_person, parent_movie = sweep.sweep(graph, source)
+        _, tree_parents = bfs_tree(graph, source)
+        for person in range(graph.person_count()):
+            if tree_parents[person] == -1:
+                assert distance[person] == -1
+                assert parent_person[person] == parent_movie[person] == -1
+                continue
+            depth = 0
+            other = person
+            while other != source:
+                other = tree_parents[other]
+                depth += 1
+            assert distance[person] == depth
+            if person != source:
+                stars = graph.stars_of(parent_movie[person])
+                assert person in stars and parent_person[person] in stars
+                assert distance[parent_person[person]] == depth - 1
@@ -0,0 +1,122 @@
+import random
+from collections import deque
+
+import pytest
+
+import degrees
+import generate
+import updates
+from trees import TreeCache
+
+
+def reference_distance(credits, source, target):
+    """
+    Returns the degrees of separation between source and target by a
+    plain breadth-first search over a set of (person_id, movie_id) credits.
+    """
+    movies_of = {}
+    stars_of = {}
+    for person_id, movie_id in credits:
+        movies_of.setdefault(person_id, set()).add(movie_id)
+        stars_of.setdefault(movie_id, set()).add(person_id)
+    distance = {source: 0}
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        if person_id == target:
+            return distance[person_id]
+        for movie_id in movies_of.get(person_id, ()):
+            for star in stars_of[movie_id]:
+                if star not in distance:
+                    distance[star] = distance[person_id] + 1
+                    queue.append(star)
+    return None
+
+
+def check_queries(rng, credits, count=30):
+    person_ids = list(degrees.people)
+    for _ in range(count):
+        source = rng.choice(person_ids)
+        target = rng.choice(person_ids)
+        path = degrees.shortest_path(source, target)
+        expected = reference_distance(credits, source, target)
+        if expected is None:
+            assert path is None
+            continue
+        assert path is not None and len(path) == expected
+        person_id = source
+        for movie_id, next_id in path:
+            assert (person_id, movie_id) in credits and (next_id, movie_id) in credits
+            person_id = next_id
+        assert person_id == target
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_random_edits_match_fresh_search(tmp_path, cached):
+    rng = random.Random(7)
+    generate.generate(tmp_path, 3000, seed=3)
+    degrees.tree_cache = None
+    degrees.load_data(str(tmp_path))
+    if cached:
+        degrees.tree_cache = TreeCache(degrees.graph)
+    credits = {
+        (person_id, movie_id)
+        for person_id in degrees.people
+        for movie_id in degrees.people[person_id]["movies"]
+    }
+    check_queries(rng, credits)
+
+    for day in range(6):
+        new_people = [f"new-person-{day}-{i}" for i in range(5)]
+        for person_id in new_people:
+            updates.add_person(person_id, f"New Person {person_id}", "")
+        movie_id = f"new-movie-{day}"
+        updates.add_movie(movie_id, f"New Movie {day}", "2024")
+        person_ids = list(degrees.people)
+        movie_ids = list(degrees.movies)
+
+        # A day of new rows, applied in one batch, some of them repeats
+        rows = [(person_id, movie_id) for person_id in new_people[:3]]
+        rows += [(rng.choice(person_ids), rng.choice(movie_ids)) for _ in range(40)]
+        rows += rows[:5]
+        updates.add_stars(rows)
+        credits.update(rows)
+
+        # Single edits in between
+        person_id, movie_id = rng.choice(sorted(credits))
+        updates.remove_star(person_id, movie_id)
+        credits.discard((person_id, movie_id))
+        person_id = rng.choice(person_ids)
+        movie_id = rng.choice(movie_ids)
+        updates.add_star(person_id, movie_id)
+        credits.add((person_id, movie_id))
+        if day % 2 == 1:
+            person_id = rng.choice(person_ids)
+            updates.remove_person(person_id)
+            credits = {credit for credit in credits if credit[0] != person_id}
+
+        check_queries(rng, credits)
+
+    degrees.tree_cache = None
+
+
+def test_add_stars_keeps_rows_sorted(tmp_path):
+    generate.generate(tmp_path, 1000, seed=5)
+    degrees.tree_cache = None
+    degrees.load_data(str(tmp_path))
+    graph = degrees.graph
+    person_ids = list(degrees.people)
+    movie_ids = list(degrees.movies)
+    rng = random.Random(1)
+    rows = [(rng.choice(person_ids), rng.choice(movie_ids)) for _ in range(200)]
+    updates.add_stars(rows)
+
+    for person in range(graph.person_count()):
+        movies = list(graph.movies_of(person))
+        assert movies == sorted(set(movies))
+    for movie in range(graph.movie_count()):
+        stars = list(graph.stars_of(movie))
+        assert stars == sorted(set(stars))
+    assert len(graph.person_movies) == len(graph.movie_stars) == graph.person_offsets[-1]
+    for person_id, movie_id in rows:
+        assert movie_id in degrees.people[person_id]["movies"]
@@ -0,0 +1,180 @@
+from array import array
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "trees", "nbytes", "max_bytes"])
+
+
+class TreeCache():
+    """
+    Least-recently-used cache of single-source breadth-first search trees,
+    bounded by the total size of the parent arrays it holds.
+
+    Since the co-star graph is undirected, a tree rooted at either end of
+    a query answers it, so path() only searches when neither end is cached.
+    """
+
+    def __init__(self, graph, max_bytes=64 * 1024 * 1024):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, source, target):
+        """
+        Returns the shortest list of (movie, person) index pairs from
+        source to target, or None if they are not connected.
+
+        On a miss the tree for source is built and cached.
+        """
+        if source in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(source)
+            return path_from_root(self.trees[source], source, target)
+        if target in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(target)
+            return path_to_root(self.trees[target], source, target)
+        self.misses += 1
+        return path_from_root(self.tree(source), source, target)
+
+    def tree(self, source):
+        """
+        Returns the (parent_movie, parent_person) arrays rooted at source,
+        building and caching them if needed.
+        """
+        if source in self.trees:
+            self.trees.move_to_end(source)
+            return self.trees[source]
+        tree = bfs_tree(self.graph, source)
+        size = tree_size(tree)
+        if size > self.max_bytes:
+            return tree
+        while self.nbytes + size > self.max_bytes:
+            _, evicted = self.trees.popitem(last=False)
+            self.nbytes -= tree_size(evicted)
+            self.evictions += 1
+        self.trees[source] = tree
+        self.nbytes += size
+        return tree
+
+    def add_person(self):
+        """
+        Extends every cached tree with the graph's newest person,
+        whom no tree reaches yet.
+        """
+        for tree in self.trees.values():
+            for parents in tree:
+                parents.append(-1)
+                self.nbytes += parents.itemsize
+
+    def star_added(self, person, movie):
+        """
+        Drops the trees that the new edge between person and movie can
+        shorten: those that reach any star of movie, person included.
+        Trees outside that component are unaffected.
+        """
+        self.stars_added([movie])
+
+    def stars_added(self, movies):
+        """
+        Drops the trees that new stars of any of movies can shorten,
+        checking each tree once for the whole batch.
+        """
+        stars = {star for movie in movies for star in self.graph.stars_of(movie)}
+        self.discard(lambda tree: any(tree[1][star] != -1 for star in stars))
+
+    def star_removed(self, person, movie):
+        """
+        Drops the trees that used the removed edge between person and
+        movie. Any other tree is still a shortest-path tree.
+        """
+        stars = self.graph.stars_of(movie)
+
+        def uses_edge(tree):
+            parent_movie, parent_person = tree
+            if parent_movie[person] == movie:
+                return True
+            return any(parent_movie[star] == movie and parent_person[star] == person for star in stars)
+        self.discard(uses_edge)
+
+    def discard(self, affected):
+        for source, tree in list(self.trees.items()):
+            if affected(tree):
+                del self.trees[source]
+                self.nbytes -= tree_size(tree)
+
+    def clear(self):
+        self.trees.clear()
+        self.nbytes = 0
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self.trees), self.nbytes, self.max_bytes)
+
+
+def bfs_tree(graph, source):
+    """
+    Returns (parent_movie, parent_person) arrays from a breadth-first
+    search of the whole component of source. People the search did not
+    reach have a parent of -1; source is its own parent.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    parent_movie = array("i", [-1]) * graph.person_count()
+    parent_person = array("i", [-1]) * graph.person_count()
+    seen_movies = bytearray(graph.movie_count())
+    parent_person[source] = source
+
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person in frontier:
+            for movie in person_movies[person_offsets[person]:person_offsets[person + 1]]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                    if parent_person[star] == -1:
+                        parent_person[star] = person
+                        parent_movie[star] = movie
+                        next_frontier.append(star)
+        frontier = next_frontier
+    return parent_movie, parent_person
+
+
+def path_from_root(tree, root, target):
+    """
+    Returns the path from the root of tree to target, or None.
+    """
+    parent_movie, parent_person = tree
+    if parent_person[target] == -1:
+        return None
+    path = []
+    while target != root:
+        path.append((parent_movie[target], target))
+        target = parent_person[target]
+    path.reverse()
+    return path
+
+
+def path_to_root(tree, source, root):
+    """
+    Returns the path from source to the root of tree, or None.
+    """
+    parent_movie, parent_person = tree
+    if parent_person[source] == -1:
+        return None
+    path = []
+    while source != root:
+        path.append((parent_movie[source], parent_person[source]))
+        source = parent_person[source]
+    return path
+
+
+def tree_size(tree):
+    return sum(len(parents) * parents.itemsize for parents in tree)
@@ -0,0 +1,137 @@
+import degrees
+from graph import NamesView, PeopleView, MoviesView
+
+
+# Each function edits degrees.graph in place, then patches what was built
+# from it: components are merged on additions and rebuilt lazily after
+# removals, cached search trees are extended or dropped only when the edit
+# can change them, and the landmark index is dropped because its distances
+# no longer bound the edited graph.
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person with no movies yet.
+    """
+    graph = degrees.graph
+    previous_count = graph.person_count()
+    person = graph.add_person(person_id, name, birth)
+    degrees.name_index.add_person(person)
+    if graph.person_count() > previous_count:
+        degrees.components.add_person()
+        if degrees.tree_cache is not None:
+            degrees.tree_cache.add_person()
+        degrees.landmark_index = None
+    refresh_views()
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie with no stars yet.
+    """
+    degrees.graph.add_movie(movie_id, title, year)
+    refresh_views()
+
+
+def add_star(person_id, movie_id):
+    """
+    Records that a person starred in a movie.
+    """
+    person, movie = find(person_id, movie_id)
+    graph = degrees.graph
+    cast = graph.stars_of(movie)
+    if not graph.add_star(person, movie):
+        return
+    if len(cast) > 0:
+        degrees.components.union(person, cast[0])
+    if degrees.tree_cache is not None:
+        degrees.tree_cache.star_added(person, movie)
+    degrees.landmark_index = None
+
+
+def add_stars(rows):
+    """
+    Records many (person_id, movie_id) credits at once, such as the new
+    rows of a day's stars.csv, rebuilding the graph's adjacency once for
+    all of them. Every person and movie must already exist.
+    """
+    graph = degrees.graph
+    pairs = [find(person_id, movie_id) for person_id, movie_id in rows]
+
+    # A star of each movie from before the batch, to join newcomers to
+    firsts = {}
+    for _, movie in pairs:
+        cast = graph.stars_of(movie)
+        if len(cast) > 0:
+            firsts[movie] = cast[0]
+
+    added = graph.add_stars(pairs)
+    if not added:
+        return
+    for person, movie in added:
+        degrees.components.union(person, firsts.setdefault(movie, person))
+    if degrees.tree_cache is not None:
+        degrees.tree_cache.stars_added({movie for _, movie in added})
+    degrees.landmark_index = None
+
+
+def remove_star(person_id, movie_id):
+    """
+    Forgets that a person starred in a movie.
+    """
+    person, movie = find(person_id, movie_id)
+    remove_edge(person, movie)
+
+
+def remove_person(person_id):
+    """
+    Removes a person and every movie credit they had.
+    """
+    graph = degrees.graph
+    person = graph.find_person(person_id)
+    if person is None:
+        raise KeyError(person_id)
+    for movie in list(graph.movies_of(person)):
+        remove_edge(person, movie)
+    degrees.name_index.remove_person(person)
+    graph.remove_person(person)
+    refresh_views()
+
+
+def remove_movie(movie_id):
+    """
+    Removes a movie and every star credit it had.
+    """
+    graph = degrees.graph
+    movie = graph.find_movie(movie_id)
+    if movie is None:
+        raise KeyError(movie_id)
+    for person in list(graph.stars_of(movie)):
+        remove_edge(person, movie)
+    graph.remove_movie(movie)
+    refresh_views()
+
+
+def remove_edge(person, movie):
+    if not degrees.graph.remove_star(person, movie):
+        return
+    degrees.components.invalidate()
+    if degrees.tree_cache is not None:
+        degrees.tree_cache.star_removed(person, movie)
+    degrees.landmark_index = None
+
+
+def find(person_id, movie_id):
+    person = degrees.graph.find_person(person_id)
+    if person is None:
+        raise KeyError(person_id)
+    movie = degrees.graph.find_movie(movie_id)
+    if movie is None:
+        raise KeyError(movie_id)
+    return person, movie
+
+
+def refresh_views():
+    degrees.names = NamesView(degrees.graph)
+    degrees.people = PeopleView(degrees.graph)
+    degrees.movies = MoviesView(degrees.graph)
@@ -1,3 +1,8 @@
+import heapq
+from collections import deque
+from itertools import count
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -7,13 +12,16 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Maps each state in the frontier to how many nodes hold it
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +30,16 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node.state)
             return node
 
+    def forget(self, state):
+        if self.states[state] == 1:
+            del self.states[state]
+        else:
+            self.states[state] -= 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +47,65 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node.state)
+            return node
+
+
+class PriorityFrontier(StackFrontier):
+    """
+    Frontier that always removes the node with the lowest key(node).
+    Nodes with equal keys are removed in the order they were added.
+    """
+
+    def __init__(self, key):
+        super().__init__()
+        self.frontier = []
+        self.key = key
+        self.counter = count()
+
+    def add(self, node):
+        heapq.heappush(self.frontier, (self.key(node), next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            self.forget(node.state)
             return node
+
+
+class SearchStats():
+    """
+    What one shortest_path call did: which search answered it, how many
+    people it expanded and adjacency entries it scanned, its largest
+    frontier and deepest level, and how long each step took in seconds.
+
+    resolve_time is the time spent turning names into person_ids before
+    the call, and lookup_time the time spent finding those ids in the
+    graph and checking that they are connected.
+    """
+
+    def __init__(self, load_time=None, resolve_time=0.0):
+        self.method = None
+        self.nodes_expanded = 0
+        self.edges_scanned = 0
+        self.peak_frontier = 0
+        self.depth = 0
+        self.load_time = load_time
+        self.resolve_time = resolve_time
+        self.lookup_time = 0.0
+        self.search_time = 0.0
+
+    def frontier_size(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"SearchStats({fields})"
@@ -0,0 +1,203 @@
+"""
+Tic Tac Toe engine on bitboards
+
+Each side's marks are a 9-bit integer, with cell (i, j) at bit 3 * i + j.
+minimax takes and returns the same boards and moves as tictactoe.minimax,
+so runner.py can use either engine.
+"""
+
+import math
+
+from tictactoe import X, O, EMPTY
+
+FULL = 0b111111111
+
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# Search order of the cells: centre, corners, then edges
+MOVE_ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+# Value of a win with no marks on the board; a win with n marks is worth
+# WIN_VALUE - n to X and the negative of that to O
+WIN_VALUE = 100
+
+# Whether a stored value is exact or only a lower or upper bound
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps (xMask, oMask) to (value, bound, bestMove)
+transpositionTable = {}
+
+
+def from_board(board):
+    """
+    Returns (xMask, oMask) for a list-of-lists board.
+    """
+    xMask = 0
+    oMask = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                xMask |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                oMask |= 1 << (3 * i + j)
+    return xMask, oMask
+
+
+def to_board(xMask, oMask):
+    """
+    Returns the list-of-lists board for (xMask, oMask).
+    """
+    board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append(X if xMask & bit else O if oMask & bit else EMPTY)
+        board.append(row)
+    return board
+
+
+def count(mask):
+    return bin(mask).count("1")
+
+
+def player(xMask, oMask):
+    """
+    Returns the player who has the next turn.
+    """
+    return O if count(xMask) > count(oMask) else X
+
+
+def actions(xMask, oMask):
+    """
+    Returns the empty cells as bit indices in row-major order.
+    """
+    empty = FULL & ~(xMask | oMask)
+    return [cell for cell in range(9) if empty >> cell & 1]
+
+
+def has_won(mask):
+    for winMask in WIN_MASKS:
+        if mask & winMask == winMask:
+            return True
+    return False
+
+
+def utility(xMask, oMask):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if has_won(xMask):
+        return 1
+    if has_won(oMask):
+        return -1
+    return 0
+
+
+def terminal(xMask, oMask):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return xMask | oMask == FULL or has_won(xMask) or has_won(oMask)
+
+
+def minimax(board):
+    """
+    Returns the optimal move (i, j) for the current player on the board,
+    the same one tictactoe.minimax chooses.
+    """
+    xMask, oMask = from_board(board)
+    if terminal(xMask, oMask):
+        return None
+    isMax = player(xMask, oMask) == X
+    bestValue, bestMove = alphabeta(xMask, oMask, isMax, -math.inf, math.inf)
+    bestMove = first_tied_move(xMask, oMask, isMax, bestValue, bestMove)
+    return divmod(bestMove, 3)
+
+
+def first_tied_move(xMask, oMask, isMax, bestValue, bestMove):
+    """
+    Returns the first cell in row-major order worth bestValue, testing
+    each cell before bestMove with a null window.
+    """
+    for cell in actions(xMask, oMask):
+        if cell == bestMove:
+            break
+        bit = 1 << cell
+        if isMax:
+            value, _ = alphabeta(xMask | bit, oMask, False, bestValue - 1, bestValue)
+            if value >= bestValue:
+                return cell
+        else:
+            value, _ = alphabeta(xMask, oMask | bit, True, bestValue, bestValue + 1)
+            if value <= bestValue:
+                return cell
+    return bestMove
+
+
+def alphabeta(xMask, oMask, isMax, alpha, beta):
+    """
+    Returns (value, bestMove) for the position by alpha-beta search, with
+    X maximizing. value is exact if it lies strictly between alpha and
+    beta, otherwise it is a bound on the same side of the window.
+    """
+    marks = xMask | oMask
+    if has_won(xMask):
+        return WIN_VALUE - count(marks), None
+    if has_won(oMask):
+        return count(marks) - WIN_VALUE, None
+    if marks == FULL:
+        return 0, None
+
+    key = (xMask, oMask)
+    hintMove = None
+    if key in transpositionTable:
+        value, bound, hintMove = transpositionTable[key]
+        if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+            return value, hintMove
+
+    originalAlpha = alpha
+    originalBeta = beta
+    bestValue = None
+    bestMove = None
+    for cell in ordered_moves(marks, hintMove):
+        bit = 1 << cell
+        if isMax:
+            value, _ = alphabeta(xMask | bit, oMask, False, alpha, beta)
+        else:
+            value, _ = alphabeta(xMask, oMask | bit, True, alpha, beta)
+        if bestMove == None or (isMax and value > bestValue) or (not isMax and value < bestValue):
+            bestValue = value
+            bestMove = cell
+        if isMax:
+            alpha = max(alpha, bestValue)
+        else:
+            beta = min(beta, bestValue)
+        if alpha >= beta:
+            break
+
+    if bestValue <= originalAlpha:
+        bound = UPPER
+    elif bestValue >= originalBeta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transpositionTable[key] = (bestValue, bound, bestMove)
+    return bestValue, bestMove
+
+
+def ordered_moves(marks, hintMove=None):
+    """
+    Returns the empty cells, starting with hintMove if it is given, then
+    the centre, the corners and the edges.
+    """
+    moves = [cell for cell in MOVE_ORDER if not marks >> cell & 1 and cell != hintMove]
+    if hintMove != None:
+        moves.insert(0, hintMove)
+    return moves
@@ -0,0 +1,327 @@
+"""
+m,n,k game player
+
+Two players take turns marking cells of an m by n board, and the first
+to get k marks in a row, column or diagonal wins: 3,3,3 is Tic Tac Toe
+and 15,15,5 is Gomoku. Boards are lists of lists of X, O and EMPTY, as
+in tictactoe.py.
+"""
+
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Directions a line of marks can run in: across, down and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Game():
+    """
+    An m by n board on which k in a row wins.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every k cells in a line, which one side must hold to win
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    endI = i + di * (k - 1)
+                    endJ = j + dj * (k - 1)
+                    if 0 <= endI < m and 0 <= endJ < n:
+                        self.windows.append([(i + di * step, j + dj * step) for step in range(k)])
+
+        # A win is worth more than any evaluation can add up to
+        self.winValue = 10 ** (k + 1) * max(len(self.windows), 1)
+
+    def initial_state(self):
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        xCount = sum(row.count(X) for row in board)
+        oCount = sum(row.count(O) for row in board)
+        return O if xCount > oCount else X
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.m) for j in range(self.n) if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns a new board with the current player's mark at action.
+        """
+        i, j = action
+        if board[i][j] != EMPTY:
+            raise ValueError("cell is already taken")
+        newBoard = [list(row) for row in board]
+        newBoard[i][j] = self.player(board)
+        return newBoard
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for window in self.windows:
+            first = board[window[0][0]][window[0][1]]
+            if first != EMPTY and all(board[i][j] == first for i, j in window):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner(board) != None or all(EMPTY not in row for row in board)
+
+    def wins_at(self, board, i, j):
+        """
+        Returns True if the mark at (i, j) completes k in a row.
+        """
+        mark = board[i][j]
+        for di, dj in DIRECTIONS:
+            length = 1
+            for sign in (1, -1):
+                a = i + sign * di
+                b = j + sign * dj
+                while 0 <= a < self.m and 0 <= b < self.n and board[a][b] == mark:
+                    length += 1
+                    a += sign * di
+                    b += sign * dj
+            if length >= self.k:
+                return True
+        return False
+
+    def evaluate(self, board, mark):
+        """
+        Returns a heuristic value of the board for mark: every line of k
+        cells that only one side has marks in counts for that side, ten
+        times more for each mark in it.
+        """
+        value = 0
+        for window in self.windows:
+            own = 0
+            other = 0
+            for i, j in window:
+                cell = board[i][j]
+                if cell == mark:
+                    own += 1
+                elif cell != EMPTY:
+                    other += 1
+            if other == 0 and own > 0:
+                value += 10 ** own
+            elif own == 0 and other > 0:
+                value -= 10 ** other
+        return value
+
+    def candidates(self, board):
+        """
+        Returns the empty cells worth searching, nearest the centre first.
+        On boards larger than 5 by 5 only the cells next to a mark are
+        considered, or the centre if the board is empty. A full board has
+        none.
+        """
+        centreI = (self.m - 1) / 2
+        centreJ = (self.n - 1) / 2
+        if self.m * self.n <= 25:
+            moves = self.actions(board)
+        else:
+            moves = set()
+            marked = False
+            for i in range(self.m):
+                for j in range(self.n):
+                    if board[i][j] == EMPTY:
+                        continue
+                    marked = True
+                    for a in range(max(i - 1, 0), min(i + 2, self.m)):
+                        for b in range(max(j - 1, 0), min(j + 2, self.n)):
+                            if board[a][b] == EMPTY:
+                                moves.add((a, b))
+            if not marked:
+                moves = {(self.m // 2, self.n // 2)}
+        return sorted(moves, key=lambda move: (abs(move[0] - centreI) + abs(move[1] - centreJ), move))
+
+    def best_move(self, board, budget=1.0, maxDepth=None, executor=None):
+        """
+        Returns the best move (i, j) for the current player found within
+        budget seconds, or None if the game is over.
+
+        Searches one move deeper at a time with alpha-beta pruning,
+        scoring the positions at the depth limit with evaluate. When time
+        runs out, the best move of the deepest finished search is
+        returned, unless the unfinished one has already found a better one.
+
+        Given an executor, each move at the root is searched as a separate
+        task at every depth. The tasks cannot share alpha, so each one
+        searches its move with a full window, but the move chosen at a
+        given depth is the same.
+        """
+        if self.terminal(board):
+            return None
+        deadline = time.monotonic() + budget
+        board = [list(row) for row in board]
+        mark = self.player(board)
+        empties = sum(row.count(EMPTY) for row in board)
+        if maxDepth == None:
+            maxDepth = empties
+
+        moves = self.candidates(board)
+        bestMove = moves[0]
+        for depth in range(1, min(maxDepth, empties) + 1):
+            # Search the previous best move first, so its value sets the bar
+            moves.remove(bestMove)
+            moves.insert(0, bestMove)
+            if executor != None:
+                depthBest, alpha, finished = self.search_root_parallel(board, moves, depth, deadline, executor)
+            else:
+                depthBest, alpha, finished = self.search_root(board, moves, depth, mark, deadline)
+            if not finished:
+                # The previous best move was searched first, so any other
+                # move chosen here has beaten it at this depth
+                if depthBest != None:
+                    bestMove = depthBest
+                break
+            bestMove = depthBest
+            if abs(alpha) > self.winValue - empties - 1:
+                break
+        return bestMove
+
+    def search_root(self, board, moves, depth, mark, deadline):
+        """
+        Returns (move, value, finished) for the best of moves searched
+        depth moves deep, in order. If the deadline passes, finished is
+        False and move is the best of the moves searched so far, or None
+        if not even the first one was.
+        """
+        alpha = -self.winValue - 1
+        depthBest = None
+        try:
+            for move in moves:
+                board[move[0]][move[1]] = mark
+                value = -self.negamax(board, depth - 1, -self.winValue - 1, -alpha, other(mark), move, 1, deadline)
+                board[move[0]][move[1]] = EMPTY
+                if depthBest == None or value > alpha:
+                    alpha = value
+                    depthBest = move
+        except SearchTimeout:
+            board[move[0]][move[1]] = EMPTY
+            return depthBest, alpha, False
+        return depthBest, alpha, True
+
+    def search_root_parallel(self, board, moves, depth, deadline, executor):
+        """
+        Returns the same as search_root, searching each of moves as a
+        separate task on executor. If the deadline passes, move is the
+        best of the moves whose search finished, or None if the first
+        one's did not.
+        """
+        count = len(moves)
+        values = list(executor.map(
+            search_move, [(self.m, self.n, self.k)] * count, [board] * count, moves, [depth] * count, [deadline] * count
+        ))
+        alpha = -self.winValue - 1
+        depthBest = None
+        for move, value in zip(moves, values):
+            if value != None and (depthBest == None or value > alpha):
+                alpha = value
+                depthBest = move
+        if values[0] == None:
+            return None, alpha, False
+        return depthBest, alpha, None not in values
+
+    def negamax(self, board, depth, alpha, beta, mark, lastMove, ply, deadline):
+        """
+        Returns the value of the board for mark, the player to move, by
+        alpha-beta search depth moves deep. lastMove is the move that led
+        here; wins are worth less the more moves they take.
+        """
+        if self.wins_at(board, lastMove[0], lastMove[1]):
+            return ply - self.winValue
+        if time.monotonic() > deadline:
+            raise SearchTimeout()
+        moves = self.candidates(board)
+        if not moves:
+            return 0
+        if depth == 0:
+            return self.evaluate(board, mark)
+
+        best = -self.winValue - 1
+        for move in moves:
+            board[move[0]][move[1]] = mark
+            try:
+                value = -self.negamax(board, depth - 1, -beta, -alpha, other(mark), move, ply + 1, deadline)
+            finally:
+                board[move[0]][move[1]] = EMPTY
+            if value > best:
+                best = value
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+        return best
+
+
+def other(mark):
+    return O if mark == X else X
+
+
+# Games built by search_move in this process, by (m, n, k)
+games = {}
+
+
+def search_move(size, board, move, depth, deadline):
+    """
+    Returns the value for the current player of playing move on the
+    board, searched depth moves deep with a full window, or None if the
+    deadline passes first. Runs as a task of Game.best_move.
+    """
+    if size not in games:
+        games[size] = Game(*size)
+    game = games[size]
+    mark = game.player(board)
+    board = [list(row) for row in board]
+    board[move[0]][move[1]] = mark
+    try:
+        return -game.negamax(board, depth - 1, -game.winValue - 1, game.winValue + 1, other(mark), move, 1, deadline)
+    except SearchTimeout:
+        return None
+
+
+def main():
+    if len(sys.argv) not in (4, 5):
+        sys.exit("Usage: python mnk.py m n k [seconds per move]")
+    m, n, k = (int(value) for value in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) == 5 else 1.0
+
+    # The computer plays both sides
+    game = Game(m, n, k)
+    board = game.initial_state()
+    while not game.terminal(board):
+        mark = game.player(board)
+        move = game.best_move(board, budget)
+        board = game.result(board, move)
+        print(f"{mark} plays {move}")
+        for row in board:
+            print(" ".join(cell or "." for cell in row))
+        print()
+    winner = game.winner(board)
+    print(f"Game Over: {winner} wins." if winner else "Game Over: Tie.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Parallel Tic Tac Toe search
+
+The moves at the root, or every pair of a root move and a reply, are
+solved exactly in a process pool, then combined with the same rule as
+tictactoe.minimax: the best value wins, and ties go to the first move
+in row-major order.
+
+Given a board size and a depth instead, times mnk.Game.best_move with
+its root moves searched on a process pool against the same search run
+in this process.
+"""
+
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import tictactoe as ttt
+from mnk import Game
+
+
+def main():
+    if len(sys.argv) == 6:
+        return mnk_main(*(int(value) for value in sys.argv[1:]))
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python parallel.py [max workers] [plies]\n"
+                 "       python parallel.py max_workers m n k depth")
+    maxWorkers = int(sys.argv[1]) if len(sys.argv) >= 2 else 4
+    plies = int(sys.argv[2]) if len(sys.argv) == 3 else 1
+
+    board = ttt.initial_state()
+    ttt.transpositionTable.clear()
+    start = time.perf_counter()
+    expected = ttt.minimax(board)
+    sequential = time.perf_counter() - start
+    print(f"sequential: {expected} in {sequential * 1000:.1f}ms")
+
+    for workers in range(1, maxWorkers + 1):
+        # Forked workers would otherwise inherit the sequential search's table
+        ttt.transpositionTable.clear()
+        with ProcessPoolExecutor(workers) as executor:
+            # Start the workers first, so the timing leaves out their startup
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            move = parallel_minimax(board, executor, plies)
+            elapsed = time.perf_counter() - start
+        if move != expected:
+            sys.exit(f"{workers} workers chose {move}, not {expected}")
+        print(f"{workers} workers: {move} in {elapsed * 1000:.1f}ms, speedup {sequential / elapsed:.2f}x")
+
+
+def mnk_main(maxWorkers, m, n, k, depth):
+    game = Game(m, n, k)
+    board = game.initial_state()
+
+    # Large boards start from a centre pair, so the search has some shape
+    if m * n > 25:
+        board = game.result(board, (m // 2, n // 2))
+        board = game.result(board, (m // 2, n // 2 + 1))
+
+    start = time.perf_counter()
+    expected = game.best_move(board, math.inf, depth)
+    sequential = time.perf_counter() - start
+    print(f"sequential: {expected} in {sequential * 1000:.1f}ms")
+
+    for workers in range(1, maxWorkers + 1):
+        with ProcessPoolExecutor(workers) as executor:
+            list(executor.map(abs, range(workers)))
+            start = time.perf_counter()
+            move = game.best_move(board, math.inf, depth, executor)
+            elapsed = time.perf_counter() - start
+        if move != expected:
+            sys.exit(f"{workers} workers chose {move}, not {expected}")
+        print(f"{workers} workers: {move} in {elapsed * 1000:.1f}ms, speedup {sequential / elapsed:.2f}x")
+
+
+def parallel_minimax(board, executor=None, plies=1):
+    """
+    Returns the optimal move (i, j) for the current player on the board,
+    the same one tictactoe.minimax chooses, solving the first plies moves
+    (1 or 2) as separate tasks on executor, or on a new process pool.
+    """
+    if ttt.terminal(board):
+        return None
+    if executor is None:
+        with ProcessPoolExecutor() as executor:
+            return parallel_minimax(board, executor, plies)
+
+    cells = tuple(cell for row in board for cell in row)
+    isMax = ttt.player(board) == ttt.X
+    rootMoves = sorted(ttt.actions(board))
+    sequences = []
+    for move in rootMoves:
+        after = ttt.result(board, move)
+        if plies == 1 or ttt.terminal(after):
+            sequences.append((move,))
+        else:
+            sequences.extend((move, reply) for reply in sorted(ttt.actions(after)))
+    values = dict(zip(sequences, executor.map(solve, [cells] * len(sequences), sequences)))
+
+    bestMove = None
+    bestValue = None
+    for move in rootMoves:
+        if (move,) in values:
+            value = values[(move,)]
+        else:
+            replies = [value for sequence, value in values.items() if sequence[0] == move]
+            value = min(replies) if isMax else max(replies)
+        if bestMove == None or (isMax and value > bestValue) or (not isMax and value < bestValue):
+            bestMove = move
+            bestValue = value
+    return bestMove
+
+
+def solve(cells, moves):
+    """
+    Returns the exact value, as tictactoe.alphabeta counts it from the
+    root, of the position reached by playing moves on the board in cells.
+    """
+    board = [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+    state = ttt.GameState(board)
+    for move in moves:
+        state.make(move)
+    value, _ = ttt.alphabeta(state, len(moves), -math.inf, math.inf)
+    return value
+
+
+if __name__ == "__main__":
+    main()
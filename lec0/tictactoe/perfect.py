@@ -0,0 +1,192 @@
+"""
+Perfect-play table for Tic Tac Toe
+
+Every legal position is solved once, backwards from the finished games,
+and the answers are written to perfect.table: two bytes per position,
+the best move and the packed score and plies left to the end of the game.
+At runtime the file is memory-mapped and each lookup is one index
+computation, so the AI never searches.
+"""
+
+import mmap
+import os
+import sys
+
+from tictactoe import X, O, EMPTY, player, terminal, utility
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect.table")
+MAGIC = b"TTTPERF1"
+
+# Two bytes for each of the 3 ** 9 boards, indexed in base 3
+POSITIONS = 3 ** 9
+NO_MOVE = 255
+ILLEGAL = 255
+
+DIGITS = {EMPTY: 0, X: 1, O: 2}
+
+# Memory-mapped table, opened on first use
+table = None
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python perfect.py [table]")
+    path = sys.argv[1] if len(sys.argv) == 2 else TABLE_PATH
+    data = build()
+    save(data, path)
+    legal = sum(1 for i in range(POSITIONS) if data[2 * i + 1] != ILLEGAL)
+    print(f"Wrote {legal} positions to {path}")
+
+
+def minimax(board):
+    """
+    Returns the optimal move (i, j) for the current player on the board,
+    the same one tictactoe.minimax chooses, or None if the game is over.
+    """
+    _, _, move = lookup(board)
+    return move
+
+
+def lookup(board):
+    """
+    Returns (score, depth, move) for a legal board: the score of the game
+    under perfect play, the number of moves left until it ends, and the
+    best move (i, j), which is None if the game is over.
+    """
+    data = load()
+    i = 2 * position_index(board)
+    move = data[len(MAGIC) + i]
+    packed = data[len(MAGIC) + i + 1]
+    if packed == ILLEGAL:
+        raise ValueError("not a legal position")
+    score = (packed & 3) - 1
+    depth = packed >> 2
+    return score, depth, None if move == NO_MOVE else divmod(move, 3)
+
+
+def load():
+    """
+    Returns the memory-mapped table, building and saving it first if
+    there is no complete table file yet.
+    """
+    global table
+    if table is None:
+        table = open_table(TABLE_PATH)
+    if table is None:
+        data = build()
+        try:
+            save(data, TABLE_PATH)
+            table = open_table(TABLE_PATH)
+        except OSError:
+            pass
+        if table is None:
+            table = MAGIC + data
+    return table
+
+
+def open_table(path):
+    """
+    Returns the table file at path memory-mapped, or None if it is
+    missing, the wrong size or not a perfect-play table.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size != len(MAGIC) + 2 * POSITIONS:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(MAGIC)] != MAGIC:
+        mapped.close()
+        return None
+    return mapped
+
+
+def save(data, path):
+    # Write to a temporary file first so an interrupted build never
+    # leaves a partial table behind
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def build():
+    """
+    Returns the table contents for every legal position, found by
+    retrograde analysis: positions are solved from the full boards back
+    to the empty one, so every position's replies are already solved.
+
+    Among the best moves, wins are taken as fast as possible, losses put
+    off as long as possible, and ties go to the first in row-major order,
+    as in tictactoe.minimax.
+    """
+    layers = legal_positions()
+    data = bytearray([NO_MOVE, ILLEGAL]) * POSITIONS
+
+    # Maps each solved position to (score, moves left to the end)
+    solved = {}
+    for layer in reversed(layers):
+        for position in layer:
+            board = to_board(position)
+            if terminal(board):
+                score, depth, move = utility(board), 0, NO_MOVE
+            else:
+                mark = player(board)
+                isMax = mark == X
+                best = None
+                for cell in range(9):
+                    if position[cell] != EMPTY:
+                        continue
+                    childScore, childDepth = solved[position[:cell] + (mark,) + position[cell + 1:]]
+                    value = childScore * (100 - childDepth)
+                    if best == None or (isMax and value > best) or (not isMax and value < best):
+                        best = value
+                        score, depth, move = childScore, childDepth + 1, cell
+            solved[position] = (score, depth)
+            i = 2 * position_index(to_board(position))
+            data[i] = move
+            data[i + 1] = (score + 1) | depth << 2
+    return bytes(data)
+
+
+def legal_positions():
+    """
+    Returns the positions reachable from the empty board, as tuples of
+    9 cells, in layers by the number of marks.
+    """
+    layers = [[(EMPTY,) * 9]]
+    while True:
+        layer = {}
+        for position in layers[-1]:
+            board = to_board(position)
+            if terminal(board):
+                continue
+            mark = player(board)
+            for cell in range(9):
+                if position[cell] == EMPTY:
+                    layer[position[:cell] + (mark,) + position[cell + 1:]] = None
+        if not layer:
+            return layers
+        layers.append(list(layer))
+
+
+def to_board(position):
+    return [list(position[0:3]), list(position[3:6]), list(position[6:9])]
+
+
+def position_index(board):
+    """
+    Returns the board read as a base-3 number, one digit per cell.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + DIGITS[cell]
+    return index
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import pygame
 import sys
 import time
 
+import perfect
 import tictactoe as ttt
 
 pygame.init()
@@ -109,7 +110,7 @@ while True:
         if user != player and not game_over:
             if ai_turn:
                 time.sleep(0.5)
-                move = ttt.minimax(board)
+                move = perfect.minimax(board)
                 board = ttt.result(board, move)
                 ai_turn = False
             else:
@@ -0,0 +1,215 @@
+from functools import lru_cache
+
+import pytest
+
+import tictactoe as ttt
+
+
+@lru_cache(maxsize=None)
+def reference_value(cells):
+    """
+    Returns the value of a position by plain minimax without pruning or
+    tables: a win is worth 100 less the number of marks on the board,
+    positive for X and negative for O, and a draw is worth 0.
+    """
+    board = to_board(cells)
+    if ttt.terminal(board):
+        marks = sum(cell is not ttt.EMPTY for cell in cells)
+        return ttt.utility(board) * (100 - marks)
+    values = [reference_value(move_cells(cells, move, ttt.player(board))) for move in sorted(ttt.actions(board))]
+    return max(values) if ttt.player(board) == ttt.X else min(values)
+
+
+def reference_move(board):
+    """
+    Returns the first move in row-major order with the best value.
+    """
+    cells = to_cells(board)
+    mark = ttt.player(board)
+    values = {move: reference_value(move_cells(cells, move, mark)) for move in sorted(ttt.actions(board))}
+    best = max(values.values()) if mark == ttt.X else min(values.values())
+    return next(move for move, value in values.items() if value == best)
+
+
+def to_cells(board):
+    return tuple(cell for row in board for cell in row)
+
+
+def to_board(cells):
+    return [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+
+
+def move_cells(cells, move, mark):
+    i = 3 * move[0] + move[1]
+    return cells[:i] + (mark,) + cells[i + 1:]
+
+
+def reachable_positions():
+    """
+    Returns every position reachable from the empty board in which the
+    game is not over yet.
+    """
+    positions = []
+    seen = set()
+    stack = [to_cells(ttt.initial_state())]
+    while stack:
+        cells = stack.pop()
+        if cells in seen:
+            continue
+        seen.add(cells)
+        board = to_board(cells)
+        if ttt.terminal(board):
+            continue
+        positions.append(cells)
+        for move in ttt.actions(board):
+            stack.append(move_cells(cells, move, ttt.player(board)))
+    return sorted(positions, key=lambda cells: [cell or "" for cell in cells])
+
+
+POSITIONS = reachable_positions()
+
+
+def test_every_position_is_covered():
+    assert len(POSITIONS) == 4520
+
+
+@pytest.mark.parametrize("fresh", [True, False])
+def test_minimax_matches_reference(fresh):
+    ttt.transpositionTable.clear()
+    for cells in POSITIONS:
+        if fresh:
+            ttt.transpositionTable.clear()
+        board = to_board(cells)
+        assert ttt.minimax(board) == reference_move(board), cells
+        assert to_cells(board) == cells
+
+
+def test_bitboard_matches_reference():
+    import bitboard
+
+    bitboard.transpositionTable.clear()
+    for cells in POSITIONS:
+        board = to_board(cells)
+        assert bitboard.minimax(board) == reference_move(board), cells
+        xMask, oMask = bitboard.from_board(board)
+        assert bitboard.to_board(xMask, oMask) == board
+
+
+@pytest.fixture
+def perfect(tmp_path, monkeypatch):
+    import perfect
+
+    monkeypatch.setattr(perfect, "TABLE_PATH", str(tmp_path / "perfect.table"))
+    monkeypatch.setattr(perfect, "table", None)
+    return perfect
+
+
+def test_perfect_table_matches_reference(perfect):
+    for cells in POSITIONS:
+        board = to_board(cells)
+        score, depth, move = perfect.lookup(board)
+        assert move == reference_move(board), cells
+        value = reference_value(cells)
+        marks = sum(cell is not ttt.EMPTY for cell in cells)
+        if value == 0:
+            assert (score, depth) == (0, 9 - marks)
+        else:
+            assert (score, depth) == (1 if value > 0 else -1, 100 - abs(value) - marks)
+
+
+def test_perfect_table_rebuilds_partial_file(perfect):
+    with open(perfect.TABLE_PATH, "wb") as f:
+        f.write(perfect.MAGIC + b"\0" * 100)
+    assert perfect.minimax(ttt.initial_state()) == reference_move(ttt.initial_state())
+    with open(perfect.TABLE_PATH, "rb") as f:
+        assert f.read() == perfect.MAGIC + perfect.build()
+
+
+def test_perfect_table_builds_once_when_it_cannot_save(perfect, tmp_path, monkeypatch):
+    monkeypatch.setattr(perfect, "TABLE_PATH", str(tmp_path / "missing" / "perfect.table"))
+    builds = []
+    build = perfect.build
+    monkeypatch.setattr(perfect, "build", lambda: builds.append(None) or build())
+    assert perfect.minimax(ttt.initial_state()) == reference_move(ttt.initial_state())
+    assert len(builds) == 1
+
+
+@pytest.mark.parametrize("plies", [1, 2])
+def test_parallel_minimax_matches_reference(plies):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from parallel import parallel_minimax
+
+    ttt.transpositionTable.clear()
+    with ProcessPoolExecutor(2) as executor:
+        for cells in POSITIONS:
+            board = to_board(cells)
+            assert parallel_minimax(board, executor, plies) == reference_move(board), cells
+
+
+def test_mnk_keeps_the_perfect_play_score():
+    from mnk import Game
+
+    game = Game(3, 3, 3)
+    for cells in POSITIONS:
+        board = to_board(cells)
+        move = game.best_move(board, budget=60)
+        assert reference_value(move_cells(cells, move, ttt.player(board))) == reference_value(cells), cells
+        assert to_cells(board) == cells
+
+
+@pytest.mark.parametrize("start, blocks", [(0, {(7, 4)}), (5, {(7, 4), (7, 9)})])
+def test_mnk_blocks_an_open_four(start, blocks):
+    from mnk import Game
+
+    game = Game(15, 15, 5)
+    board = game.initial_state()
+    for j in range(start, start + 4):
+        board[7][j] = ttt.O
+    for i, j in [(2, 2), (2, 12), (12, 2), (12, 12)]:
+        board[i][j] = ttt.X
+    assert game.best_move(board, budget=5) in blocks
+
+
+def test_mnk_has_no_candidates_on_a_full_board():
+    from mnk import Game
+
+    game = Game(6, 6, 6)
+    board = [[ttt.X if (i + j // 2) % 2 else ttt.O for j in range(6)] for i in range(6)]
+    assert game.candidates(board) == []
+    assert game.terminal(board)
+
+
+def test_mnk_parallel_search_matches_sequential():
+    import random
+    from concurrent.futures import ProcessPoolExecutor
+
+    from mnk import Game
+
+    rng = random.Random(0)
+    with ProcessPoolExecutor(2) as executor:
+        for m, n, k, depth in [(3, 3, 3, 9), (4, 4, 3, 4), (15, 15, 5, 2)]:
+            game = Game(m, n, k)
+            for _ in range(6):
+                board = game.initial_state()
+                for _ in range(rng.randrange(6)):
+                    if not game.terminal(board):
+                        board = game.result(board, rng.choice(sorted(game.actions(board))))
+                sequential = game.best_move(board, budget=60, maxDepth=depth)
+                assert game.best_move(board, budget=60, maxDepth=depth, executor=executor) == sequential, board
+
+
+def test_mnk_parallel_search_keeps_the_deadline():
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+
+    from mnk import Game
+
+    game = Game(15, 15, 5)
+    board = game.result(game.result(game.initial_state(), (7, 7)), (7, 8))
+    with ProcessPoolExecutor(2) as executor:
+        list(executor.map(abs, range(2)))
+        start = time.monotonic()
+        move = game.best_move(board, budget=0.5, executor=executor)
+        assert time.monotonic() - start < 2
+    assert move in game.candidates(board)
@@ -8,6 +8,49 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, each as a function that
+# maps a cell (i, j) to the cell it is read from
+TRANSFORMS = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# Each symmetry as the list of cells, in row-major order, it reads from
+SYMMETRIES = [
+    [transform(k // 3, k % 3) for k in range(9)] for transform in TRANSFORMS
+]
+
+# Search order of the cells: centre, corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Value of a win at depth 0; a win at depth d is worth WIN_VALUE - d
+WIN_VALUE = 100
+
+# Whether a stored value is exact or only a lower or upper bound
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# The 8 lines of three cells, and the lines through each cell
+LINES = [
+    [(0, 0), (0, 1), (0, 2)], [(1, 0), (1, 1), (1, 2)], [(2, 0), (2, 1), (2, 2)],
+    [(0, 0), (1, 0), (2, 0)], [(0, 1), (1, 1), (2, 1)], [(0, 2), (1, 2), (2, 2)],
+    [(0, 0), (1, 1), (2, 2)], [(0, 2), (1, 1), (2, 0)],
+]
+LINES_THROUGH = {
+    (i, j): [line for line in LINES if (i, j) in line] for i in range(3) for j in range(3)
+}
+
+# Maps the canonical key of a position to (bestMove, value, bound), with
+# bestMove given on the canonical board and value counted from the board
+transpositionTable = {}
+
 
 def initial_state():
     """
@@ -46,12 +89,15 @@ def actions(board):
 
 def result(board, action):
     """
-    Returns the board that results from making move (i, j) on the board.
+    Returns the board that results from making move (i, j) on the board,
+    leaving the board itself unchanged.
     action: (i, j)
     """
-    curPlayer = player(board)
-    board[action[0]][action[1]] = curPlayer
-    return board
+    if board[action[0]][action[1]] != EMPTY:
+        raise ValueError("cell is already taken")
+    newBoard = [list(row) for row in board]
+    newBoard[action[0]][action[1]] = player(board)
+    return newBoard
 
 
 def winner(board):
@@ -98,6 +144,54 @@ def utility(board):
     return 0
 
 
+class GameState():
+    """
+    A board being searched, with the side to move, the empty cells (in
+    MOVE_ORDER) and the moves made so far kept up to date as moves are
+    made and unmade in place.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.player = player(board)
+        self.empty = [move for move in MOVE_ORDER if board[move[0]][move[1]] == EMPTY]
+        self.history = []
+        self.won = utility(board) != 0
+
+    def make(self, move):
+        i, j = move
+        position = self.empty.index(move)
+        del self.empty[position]
+        board = self.board
+        mark = self.player
+        board[i][j] = mark
+        self.history.append((move, position, self.won))
+        self.won = False
+        for (a, b), (c, d), (e, f) in LINES_THROUGH[move]:
+            if board[a][b] == mark and board[c][d] == mark and board[e][f] == mark:
+                self.won = True
+                break
+        self.player = O if self.player == X else X
+
+    def unmake(self):
+        (i, j), position, self.won = self.history.pop()
+        self.board[i][j] = EMPTY
+        self.empty.insert(position, (i, j))
+        self.player = O if self.player == X else X
+
+    def terminal(self):
+        return self.won or not self.empty
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        Only the player who just moved can have won.
+        """
+        if not self.won:
+            return 0
+        return -1 if self.player == X else 1
+
+
 def minimax(board):
     """
     Trả về nước đi tối ưu cho người chơi hiện tại trên bảng.
@@ -108,50 +202,142 @@ def minimax(board):
     return bestMove
 
 
+def canonical(board):
+    """
+    Returns the key of the board that is the same for all 8 of its
+    rotations and reflections, and the symmetry that produces it.
+    """
+    bestKey = None
+    bestSymmetry = None
+    for symmetry in SYMMETRIES:
+        key = "".join(board[i][j] or "." for i, j in symmetry)
+        if bestKey == None or key < bestKey:
+            bestKey = key
+            bestSymmetry = symmetry
+    return bestKey, bestSymmetry
+
+
 def minimax_processing(board, curDepth, isMax):
     """
     Trả về nước đi tối ưu cho người chơi hiện tại trên bảng.
+
+    Returns (bestMove, bestScore, bestDepth): the best move, the score it
+    leads to and the depth at which the game then ends. Wins are taken
+    as fast as possible and losses put off as long as possible, and among
+    equally good moves the first in row-major order is chosen.
+
+    The search makes and unmakes moves on a GameState over the board,
+    which is left as it was.
+    """
+    state = GameState(board)
+    if state.terminal():
+        return None, state.utility(), curDepth
+
+    bestValue, bestMove = alphabeta(state, curDepth, -math.inf, math.inf)
+    bestMove = first_tied_move(state, curDepth, isMax, bestValue, bestMove)
+
+    if bestValue == 0:
+        return bestMove, 0, curDepth + len(state.empty)
+    bestScore = 1 if bestValue > 0 else -1
+    return bestMove, bestScore, WIN_VALUE - abs(bestValue)
+
+
+def first_tied_move(state, curDepth, isMax, bestValue, bestMove):
+    """
+    Returns the first move in row-major order worth bestValue. The search
+    may have reached a later one first, so each earlier move is tested
+    with a null window around bestValue.
     """
-    if terminal(board):
-        return None, utility(board), curDepth
+    for move in sorted(state.empty):
+        if move == bestMove:
+            return bestMove
+        state.make(move)
+        if isMax:
+            value, _ = alphabeta(state, curDepth + 1, bestValue - 1, bestValue)
+            tied = value >= bestValue
+        else:
+            value, _ = alphabeta(state, curDepth + 1, bestValue, bestValue + 1)
+            tied = value <= bestValue
+        state.unmake()
+        if tied:
+            return move
+    return bestMove
+
 
+def alphabeta(state, curDepth, alpha, beta):
+    """
+    Returns (value, move) for the state by alpha-beta search, where a win
+    for X at depth d is worth WIN_VALUE - d, a win for O the negative of
+    that, and a draw 0. value is exact if it lies strictly between alpha
+    and beta, otherwise it is a bound on the same side of the window.
+    """
+    if state.terminal():
+        return state.utility() * (WIN_VALUE - curDepth), None
+
+    key, symmetry = canonical(state.board)
+    hintMove = None
+    if key in transpositionTable:
+        move, value, bound = transpositionTable[key]
+        value = value_from_table(value, curDepth)
+        hintMove = symmetry[move]
+        if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+            return value, hintMove
+
+    isMax = state.player == X
+    originalAlpha = alpha
+    originalBeta = beta
+    bestValue = None
     bestMove = None
-    bestScore = None
-    bestDepth = None
+    for move in ordered_moves(state, hintMove):
+        state.make(move)
+        value, _ = alphabeta(state, curDepth + 1, alpha, beta)
+        state.unmake()
+        if bestMove == None or (isMax and value > bestValue) or (not isMax and value < bestValue):
+            bestValue = value
+            bestMove = move
+        if isMax:
+            alpha = max(alpha, bestValue)
+        else:
+            beta = min(beta, bestValue)
+        if alpha >= beta:
+            break
 
-    for i in range(len(board)):
-        for j in range(len(board[i])):
-            if board[i][j] == EMPTY:
-                board[i][j] = player(board)
-                _, score, depth = minimax_processing(board, curDepth + 1, not isMax)
-                if bestMove == None:
-                    bestMove = (i, j)
-                    bestScore = score
-                    bestDepth = depth
-                else:
-                    if isMax and score > bestScore:
-                        bestScore = score
-                        bestMove = (i, j)
-                    elif not isMax and score < bestScore:
-                        bestScore = score
-                        bestMove = (i, j)
-                    elif score == bestScore:
-                        if isMax and score == 1 and depth < bestDepth:
-                            bestMove = (i, j)
-                            bestDepth = depth
-                        elif isMax and score != 1 and depth > bestDepth:
-                            bestMove = (i, j)
-                            bestDepth = depth
-                        elif not isMax and score == -1 and depth < bestDepth:
-                            bestMove = (i, j)
-                            bestDepth = depth
-                        elif not isMax and score != -1 and depth > bestDepth:
-                            bestMove = (i, j)
-                            bestDepth = depth
-
-                board[i][j] = EMPTY
-                if curDepth == 0:
-                    print((i, j), score, depth)
-    if curDepth == 0:
-        print()
-    return bestMove, bestScore, bestDepth
+    if bestValue <= originalAlpha:
+        bound = UPPER
+    elif bestValue >= originalBeta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transpositionTable[key] = (symmetry.index(bestMove), value_to_table(bestValue, curDepth), bound)
+    return bestValue, bestMove
+
+
+def ordered_moves(state, hintMove=None):
+    """
+    Returns the empty cells, starting with hintMove if it is given, then
+    the centre, the corners and the edges.
+    """
+    moves = [move for move in state.empty if move != hintMove]
+    if hintMove != None:
+        moves.insert(0, hintMove)
+    return moves
+
+
+def value_to_table(value, curDepth):
+    """
+    Returns value with wins counted from the board rather than the root,
+    so the same position reached at another depth can reuse it.
+    """
+    if value > 0:
+        return value + curDepth
+    if value < 0:
+        return value - curDepth
+    return 0
+
+
+def value_from_table(value, curDepth):
+    if value > 0:
+        return value - curDepth
+    if value < 0:
+        return value + curDepth
+    return 0